@@ -0,0 +1,130 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+from embedding_store import CACHE_DIR
+
+
+def alias_key(raw_title):
+    # case and spacing differences between reports are not worth a separate alias
+    return " ".join(str(raw_title).upper().split())
+
+
+# --------------------------
+# ALIAS STORE
+# --------------------------
+class AliasStore:
+    """
+    Learned raw title -> BOR title mappings, per output workbook (its "BOR workbook id")
+    and exhibitor, in a local SQLite file shared by all workbooks.
+    Filled from confident fuzzy and embedding matches, and checked after the exact match
+    but before any fuzzy or embedding work.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "aliases.sqlite")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(aliases)")]
+            if columns and "workbook" not in columns:
+                # learned before aliases were kept per workbook: they cannot be told apart,
+                # and are learned again on the next run of each workbook
+                conn.execute("DROP TABLE aliases")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS aliases (
+                    workbook  TEXT NOT NULL,
+                    exhibitor TEXT NOT NULL,
+                    raw_key   TEXT NOT NULL,
+                    bor_title TEXT NOT NULL,
+                    tier      TEXT,
+                    updated   TEXT,
+                    PRIMARY KEY (workbook, exhibitor, raw_key)
+                )
+                """
+            )
+
+    def _connect(self):
+        # a short-lived connection per call, Streamlit may call us from different threads
+        return sqlite3.connect(self.path)
+
+    def lookup(self, workbook, exhibitor, raw_titles):
+        """
+        Returns {raw title: BOR title} for the titles that have an alias.
+        """
+        keys = {alias_key(t): t for t in raw_titles}
+        if not keys:
+            return {}
+
+        found = {}
+        key_list = list(keys)
+        with closing(self._connect()) as conn:
+            # stay under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT raw_key, bor_title FROM aliases "
+                    f"WHERE workbook = ? AND exhibitor = ? AND raw_key IN ({','.join('?' * len(chunk))})",
+                    [workbook, exhibitor or "", *chunk]
+                ).fetchall()
+                for raw_key, bor_title in rows:
+                    found[keys[raw_key]] = bor_title
+        return found
+
+    def remember(self, workbook, exhibitor, matches, tier):
+        """
+        matches: {raw title: BOR title} produced by a confident match tier.
+        """
+        if not matches:
+            return
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO aliases (workbook, exhibitor, raw_key, bor_title, tier, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(workbook, exhibitor or "", alias_key(raw), bor, tier, now) for raw, bor in matches.items()]
+            )
+
+    def forget(self, workbook, exhibitor, raw_titles):
+        """
+        Drops the aliases of raw_titles, e.g. titles the catalog now matches exactly.
+        """
+        keys = list({alias_key(t) for t in raw_titles})
+        with closing(self._connect()) as conn, conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                conn.execute(
+                    f"DELETE FROM aliases "
+                    f"WHERE workbook = ? AND exhibitor = ? AND raw_key IN ({','.join('?' * len(chunk))})",
+                    [workbook, exhibitor or "", *chunk]
+                )
+
+    def prune(self, workbook, movie_list):
+        """
+        Drops the workbook's aliases whose BOR title is no longer in its "Movies" sheet.
+        Returns the number of aliases removed.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TEMP TABLE movies (title TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO movies (title) VALUES (?)",
+                [(m,) for m in movie_list]
+            )
+            cur = conn.execute(
+                "DELETE FROM aliases WHERE workbook = ? AND bor_title NOT IN (SELECT title FROM movies)",
+                (workbook,)
+            )
+            return cur.rowcount
+
+
+_store = None
+
+
+def get_alias_store():
+    global _store
+    if _store is None:
+        _store = AliasStore()
+    return _store
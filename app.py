@@ -3,9 +3,16 @@ import pandas as pd
 import tempfile
 import os
 from openpyxl import load_workbook
-from bor_main import process_pdf  
+from bor_main import process_batch, load_reference_data, prewarm_model, parse_workers, PARSE_WORKERS
+from page_cache import get_page_cache
+from result_cache import get_result_cache
+from modules.text_backends import TEXT_BACKEND, CHECK_PAGES
 import time
 
+# load the matching model in the background while the page is used (EMPIRE_BOR_PREWARM=0 to disable)
+if os.environ.get("EMPIRE_BOR_PREWARM", "1") != "0":
+    prewarm_model()
+
 st.title("Empire BOR Extraction System")
 st.write("Upload one Excel file, multiple PDF files, and optional BOR Excel files.")
 
@@ -35,6 +42,17 @@ bor_excel_files = st.file_uploader(
     accept_multiple_files=True
 )
 
+# files are parsed in this many worker processes, each file under the time / memory
+# budget (EMPIRE_BOR_FILE_TIMEOUT / EMPIRE_BOR_FILE_MEMORY_MB). With both budgets set
+# to 0, 1 parses them in the app process
+cpu_count = os.cpu_count() or 1
+workers = st.number_input(
+    "Parsing processes",
+    min_value=1,
+    max_value=cpu_count,
+    value=parse_workers(PARSE_WORKERS, cpu_count)
+)
+
 # --------------------------
 # RUN PROCESSING
 # --------------------------
@@ -64,16 +82,20 @@ if st.button("Start Processing"):
     total = len(pdf_files)
     status = st.empty()
 
-    for idx, pdf in enumerate(pdf_files, start=1):
+    # mapping sheets are read once for the whole batch
+    ref = load_reference_data(temp_excel_path)
+
+    temp_paths = []
+    upload_names = {}
+    for pdf in pdf_files:
         suffix = os.path.splitext(pdf.name)[1].lower()
         temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
         temp_pdf.write(pdf.read())
         temp_pdf.close()
-        temp_pdf_path = temp_pdf.name
-
-        process_pdf(temp_pdf_path, temp_excel_path)
+        temp_paths.append(temp_pdf.name)
+        upload_names[temp_pdf.name] = pdf.name
 
-        os.remove(temp_pdf_path)
+    def show_progress(idx, total, path):
         #progress.progress(idx / total)
         #status.write(f"Processed {idx}/{total} files")
     
@@ -95,6 +117,12 @@ if st.button("Start Processing"):
             unsafe_allow_html=True
         )
 
+    # one workbook load/save for the whole batch
+    process_batch(temp_paths, temp_excel_path, ref=ref, on_progress=show_progress, workers=int(workers))
+
+    for temp_pdf_path in temp_paths:
+        os.remove(temp_pdf_path)
+
 
     # --------------------------
     # COPY DATA FROM BOR FILES (ONCE)
@@ -153,6 +181,51 @@ if st.button("Start Processing"):
 
     st.success(f"Processing complete! Comleted in: {elapsed_str}")
 
+    page_cache = get_page_cache()
+    if page_cache is not None:
+        st.caption(
+            f"Page text cache: {page_cache.stats['hits']} hits, "
+            f"{page_cache.stats['misses']} misses"
+        )
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        st.caption(f"Parsed results: {result_cache.report()}")
+    if TEXT_BACKEND and TEXT_BACKEND != "pdfplumber":
+        st.caption(
+            f"Page text read with {TEXT_BACKEND}, compared with pdfplumber on "
+            f"{f'{CHECK_PAGES} pages' if CHECK_PAGES > 0 else 'every page'} per file: "
+            f"a difference on any other page is not caught"
+        )
+
+    if ref.unrouted:
+        st.warning(
+            f"No cinema match for {len(ref.unrouted)} file(s), check \"Cinemas Mapping\":\n\n"
+            + "\n".join(
+                f"- {upload_names.get(path, os.path.basename(path))}: `{first_line or '(no header text)'}`"
+                for path, first_line in ref.unrouted
+            )
+        )
+
+    if ref.stopped:
+        st.info(
+            f"Parsing ended at the end-of-data line (Distributor Total, Film Summary...) "
+            f"of {len(ref.stopped)} file(s), the pages after it were not read:\n\n"
+            + "\n".join(
+                f"- {upload_names.get(path, os.path.basename(path))}: page {last_page}, "
+                f"{skipped} of {page_count} pages skipped"
+                for path, last_page, skipped, page_count in ref.stopped
+            )
+        )
+
+    if ref.failed:
+        st.error(
+            f"Failed to parse {len(ref.failed)} file(s):\n\n"
+            + "\n".join(
+                f"- {upload_names.get(path, os.path.basename(path))}: {reason}"
+                for path, reason in ref.failed
+            )
+        )
+
 
 
     # --------------------------
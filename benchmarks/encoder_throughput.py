@@ -0,0 +1,79 @@
+"""
+Throughput and top-1 agreement of the title encoders on a real output workbook.
+
+Every encoder embeds the clean titles of the "Movies" sheet. The distinct raw titles of
+"Raw Data" are then ranked against the catalog (the catalog itself is used when Raw Data
+is empty). The first encoder listed is the reference for top-1 agreement.
+
+    python benchmarks/encoder_throughput.py "BOR Output.xlsx" [--encoders torch onnx onnx-int8]
+        [--threads 4] [--batch-size 64] [--onnx-dir path/to/all-MiniLM-L6-v2]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bor_main import load_reference_data, clean_title  # noqa: E402
+from matcher_backends import MODEL_NAME, OnnxEncoder  # noqa: E402
+
+
+def make_encoder(name, threads, onnx_dir):
+    if name == "torch":
+        from sentence_transformers import SentenceTransformer
+        import torch
+        if threads:
+            torch.set_num_threads(threads)
+        return SentenceTransformer(MODEL_NAME)
+    return OnnxEncoder(MODEL_NAME, name, threads, onnx_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("--encoders", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--onnx-dir")
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+    catalog = [clean_title(m) for m in ref.movie_list]
+
+    raw = pd.read_excel(args.excel_path, sheet_name="Raw Data", usecols=["Movie"])
+    queries = [clean_title(n) for n in raw["Movie"].dropna().astype(str).unique() if n.strip()]
+    if not queries:
+        queries = catalog
+
+    print(f"catalog: {len(catalog)} titles, queries: {len(queries)} titles, batch size {args.batch_size}")
+
+    reference_top1 = None
+    for name in args.encoders:
+        start = time.time()
+        encoder = make_encoder(name, args.threads, args.onnx_dir)
+        loaded = time.time() - start
+
+        # warm-up so the first batch does not count session/graph setup
+        encoder.encode(catalog[:args.batch_size], normalize_embeddings=True, batch_size=args.batch_size)
+
+        start = time.time()
+        catalog_vecs = encoder.encode(catalog, normalize_embeddings=True, batch_size=args.batch_size)
+        elapsed = time.time() - start
+
+        query_vecs = encoder.encode(queries, normalize_embeddings=True, batch_size=args.batch_size)
+        top1 = np.argmax(query_vecs @ catalog_vecs.T, axis=1)
+
+        line = f"{name:10s} load {loaded:6.2f}s  {len(catalog) / max(elapsed, 1e-9):9.1f} titles/s"
+        if reference_top1 is None:
+            reference_top1 = top1
+            line += "  (reference)"
+        else:
+            line += f"  top-1 agreement {np.mean(top1 == reference_top1) * 100:.1f}%"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Lines per second of each exhibitor module's fetch_data, with page text served from memory.
+
+Each file is routed against the reference sheets of an output workbook, its page text is
+extracted once, then the module parses it --repeat times from an in-memory page cache.
+What is timed is the module's own line loop: skip/stop classification, date/time/movie
+patterns and row building. Modules reading raw pages (tables, crops) still open the PDF
+for those. Run it before and after a parser change on the same files.
+
+    python benchmarks/line_classifier.py "BOR Output.xlsx" reports/*.pdf [--repeat 20]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bor_main import load_reference_data, get_first_line, module_args  # noqa: E402
+from modules.document import ParsedDocument  # noqa: E402
+
+
+class MemoryPageCache:
+    """
+    The page text cache interface of ParsedDocument, backed by a dict.
+    """
+
+    def __init__(self, page_count, pages):
+        self.page_count = page_count
+        self.pages = pages
+        self.stats = Counter()
+
+    def load(self, key):
+        return self.page_count, dict(self.pages)
+
+    def store(self, key, page_count, pages):
+        pass
+
+
+def route_file(path, ref):
+    with ParsedDocument(path) as doc:
+        first_line = get_first_line(doc, ref.cinema_map, mode="page")
+        route = ref.route(first_line) if first_line is not None else None
+        if route is None or route[3] is None or not path.lower().endswith(".pdf"):
+            return None, None
+        pages = {index: doc.page_text(index) for index in range(doc.page_count)}
+        return route, MemoryPageCache(doc.page_count, pages)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+
+    lines = defaultdict(int)
+    seconds = defaultdict(float)
+    files = Counter()
+    for path in args.files:
+        route, cache = route_file(path, ref)
+        if route is None:
+            print("not routed to a PDF module, left out:", path)
+            continue
+        _, _, exhibitor, module = route
+        name = module.__name__.rsplit(".", 1)[-1]
+        fetch_args = module_args(exhibitor, ref)
+
+        for _ in range(args.repeat):
+            # a fresh document every run: stop_pages() marks the one it is called on
+            doc = ParsedDocument(path, cache=cache)
+            doc._content_key = path     # no hashing, the memory cache ignores the key
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                module.fetch_data(doc, *fetch_args)
+            seconds[name] += time.perf_counter() - start
+            lines[name] += sum(len(doc.page_lines(index)) for index in doc.pages_read)
+            doc.close()
+        files[name] += 1
+
+    print(f"{'module':24s} {'files':>5s} {'lines':>9s} {'seconds':>8s} {'lines/sec':>10s}")
+    for name in sorted(seconds):
+        rate = lines[name] / seconds[name] if seconds[name] else 0
+        print(f"{name:24s} {files[name]:5d} {lines[name]:9d} {seconds[name]:8.3f} {rate:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the matcher backends on a real output workbook.
+
+The catalog is the "Movies" sheet and the queries are the distinct raw titles of the
+"Raw Data" sheet. The transformer backend is the reference. For every other backend
+it prints:
+  - top-1 agreement: the same catalog title ranks first for the same raw title
+  - mapped agreement: MovieCatalog gives the same final result (threshold and prefix
+    fallback included, aliases left out)
+  - build and query time
+
+    python benchmarks/matcher_accuracy.py "BOR Output.xlsx" [--backends transformer tfidf]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bor_main import MovieCatalog, load_reference_data, clean_title  # noqa: E402
+from matcher_backends import BACKENDS, make_backend  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+    raw = pd.read_excel(args.excel_path, sheet_name="Raw Data", usecols=["Movie"])
+    names = [n for n in raw["Movie"].dropna().astype(str).unique().tolist() if n.strip()]
+    queries = [clean_title(n) for n in names]
+    catalog_titles = [clean_title(m) for m in ref.movie_list]
+
+    print(f"catalog: {len(catalog_titles)} titles, queries: {len(names)} distinct raw titles")
+
+    results = {}
+    for name in args.backends:
+        start = time.time()
+        backend = make_backend(catalog_titles, name)
+        built = time.time() - start
+
+        start = time.time()
+        top1 = np.argmax(backend.similarity(queries), axis=1)
+        queried = time.time() - start
+
+        catalog = MovieCatalog(ref.movie_list, backend=name)
+        mapped = catalog.match_many(names)
+
+        results[name] = (top1, mapped)
+        print(f"{name:12s} build {built:.3f}s  query {queried:.3f}s  | {catalog.tier_report()}")
+
+    reference = "transformer"
+    if reference not in results:
+        return
+
+    ref_top1, ref_mapped = results[reference]
+    for name, (top1, mapped) in results.items():
+        if name == reference:
+            continue
+        top1_agree = float(np.mean(top1 == ref_top1)) * 100
+        mapped_agree = np.mean([mapped[n] == ref_mapped[n] for n in names]) * 100
+        print(f"{name} vs {reference}: top-1 agreement {top1_agree:.1f}%, mapped agreement {mapped_agree:.1f}%")
+
+        for n in names:
+            if mapped[n] != ref_mapped[n]:
+                print(f"    {n!r}: {reference}={ref_mapped[n]!r} {name}={mapped[n]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Regression check: every page of a report is layout-analysed (extract_text) at most once.
+
+Each file goes through build_output, routing included, against the reference sheets of
+an output workbook. pdfplumber's Page.extract_text is wrapped to count the real calls per
+page, whichever code path makes them. Exits with status 1 if any page was extracted twice.
+The routing header crop of page 0 (EMPIRE_BOR_ROUTING=header) and pages given by a fast
+text backend (EMPIRE_BOR_TEXT_BACKEND) are counted on their own, and pages never extracted
+(after a parser's end-of-data line) are shown as skipped.
+
+    python benchmarks/page_extraction_count.py "BOR Output.xlsx" reports/*.pdf
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+from collections import Counter
+
+import pdfplumber
+from pdfplumber.page import Page, CroppedPage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bor_main import load_reference_data, build_output  # noqa: E402
+from modules.text_backends import BACKENDS  # noqa: E402
+
+
+calls = Counter()
+header_crops = Counter()
+_extract_text = Page.extract_text
+
+
+fast_pages = Counter()
+
+
+def counted_backend(backend_class):
+    page_text = backend_class.page_text
+
+    def counted_page_text(self, index):
+        fast_pages[index] += 1
+        return page_text(self, index)
+    backend_class.page_text = counted_page_text
+
+
+def counted_extract_text(self, *args, **kwargs):
+    if isinstance(self, CroppedPage):
+        header_crops[self.page_number] += 1
+    else:
+        calls[self.page_number] += 1
+    return _extract_text(self, *args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--verbose", action="store_true", help="show the parsers' own output")
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+    Page.extract_text = counted_extract_text
+    for backend_class, _ in BACKENDS.values():
+        counted_backend(backend_class)
+
+    failed = []
+    total_pages = total_calls = 0
+    total_time = 0.0
+    for path in args.files:
+        calls.clear()
+        header_crops.clear()
+        fast_pages.clear()
+        start = time.time()
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            output = build_output(path, ref)
+        elapsed = time.time() - start
+
+        pages = len(calls)
+        # pages of a fast backend's check are extracted by pdfplumber too, counted there
+        fast = len({index + 1 for index in fast_pages} - set(calls))
+        skipped = 0
+        if path.lower().endswith(".pdf"):
+            with pdfplumber.open(path) as pdf:
+                skipped = len(pdf.pages) - pages - fast
+        worst = max(calls.values(), default=0)
+        total_pages += pages
+        total_calls += sum(calls.values())
+        total_time += elapsed
+
+        status = "ok" if worst <= 1 else "REPEATED"
+        if worst > 1:
+            failed.append(path)
+        routed = "parsed" if output is not None else "skipped"
+        print(f"{os.path.basename(path):40s} {pages:4d} pages  {sum(calls.values()):4d} extract_text  "
+              f"max/page {worst}  {fast:3d} fast  {skipped:3d} skipped  {sum(header_crops.values())} header  {elapsed:6.2f}s  {routed:7s} {status}")
+
+    print(f"total: {total_pages} pages, {total_calls} extract_text calls, {total_time:.2f}s")
+    if failed:
+        print("pages extracted more than once in:", ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Checks each declarative exhibitor spec (modules/specs.py) against its hand-written module.
+
+Every file routed to a module that has a spec is parsed by both, from the same in-memory
+page text. The rows must be equal, value for value, Extraction Date aside; the first
+differing row is printed. Also times both over --repeat runs. Exits with status 1 on any
+difference.
+
+    python benchmarks/spec_parity.py "BOR Output.xlsx" reports/*.pdf [--repeat 20]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bor_main import load_reference_data, module_args  # noqa: E402
+from modules.document import ParsedDocument  # noqa: E402
+from modules.specs import spec_for  # noqa: E402
+from line_classifier import route_file  # noqa: E402
+
+
+def timed_fetch(parser, path, cache, fetch_args, repeat):
+    df = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        doc = ParsedDocument(path, cache=cache)
+        doc._content_key = path
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = parser.fetch_data(doc, *fetch_args)
+        doc.close()
+    return df, (time.perf_counter() - start) / repeat
+
+
+def first_difference(expected, actual):
+    if expected.shape != actual.shape:
+        return f"shape {expected.shape} != {actual.shape}"
+    for i in range(len(expected)):
+        a = expected.iloc[i].tolist()
+        b = actual.iloc[i].tolist()
+        if a != b:
+            return f"row {i}:\n  module {a}\n  spec   {b}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+
+    failed = []
+    for path in args.files:
+        route, cache = route_file(path, ref)
+        if route is None:
+            continue
+        _, _, exhibitor, module = route
+        spec = spec_for(module)
+        if spec is None:
+            continue
+        fetch_args = module_args(exhibitor, ref)
+
+        expected, module_time = timed_fetch(module, path, cache, fetch_args, args.repeat)
+        actual, spec_time = timed_fetch(spec, path, cache, fetch_args, args.repeat)
+        # column 4 is the Extraction Date, the time of the run
+        difference = first_difference(expected.drop(columns=4), actual.drop(columns=4))
+
+        status = "same" if difference is None else "DIFFERENT"
+        print(f"{os.path.basename(path):40s} {module.__name__.rsplit('.', 1)[-1]:22s} "
+              f"{len(expected):6d} rows  module {module_time * 1000:8.2f} ms  "
+              f"spec {spec_time * 1000:8.2f} ms  {status}")
+        if difference is not None:
+            print(" ", difference)
+            failed.append(path)
+
+    if failed:
+        print("spec output differs from the module in:", ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
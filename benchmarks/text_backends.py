@@ -0,0 +1,105 @@
+"""
+Pages per second of each page text backend, per report family (exhibitor module).
+
+Each file is routed against the reference sheets of an output workbook. Every backend
+then extracts all of its pages, and the module parses the file from that backend's text,
+unchecked (check pages off). Per module and backend it prints:
+  - pages/sec of the extraction alone
+  - pages whose text is identical to pdfplumber's
+  - files whose rows are identical to the pdfplumber parse, Extraction Date aside
+A family with all pages and rows identical on its real reports is a candidate for
+opting in to a backend: TEXT_BACKEND in its module.
+
+    python benchmarks/text_backends.py "BOR Output.xlsx" reports/*.pdf [--backends pdfium]
+"""
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber  # noqa: E402
+
+from bor_main import load_reference_data, get_first_line, module_args  # noqa: E402
+from modules.document import ParsedDocument  # noqa: E402
+from modules.text_backends import BACKENDS, available, open_backend  # noqa: E402
+
+
+def extract_all(name, path):
+    start = time.perf_counter()
+    if name == "pdfplumber":
+        with pdfplumber.open(path) as pdf:
+            texts = [page.extract_text() or "" for page in pdf.pages]
+    else:
+        backend = open_backend(name, path)
+        texts = [backend.page_text(index) for index in range(backend.page_count)]
+        backend.close()
+    return texts, time.perf_counter() - start
+
+
+def parse_rows(name, path, module, fetch_args):
+    doc = ParsedDocument(path)
+    doc.use_text_backend(name, check_pages=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = module.fetch_data(doc, *fetch_args)
+    doc.close()
+    # the 5th column is the Extraction Date, the time of the run
+    return df.drop(columns=df.columns[4]) if df is not None and len(df.columns) > 4 else df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("excel_path")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    args = parser.parse_args()
+
+    ref = load_reference_data(args.excel_path)
+    backends = ["pdfplumber"] + [b for b in args.backends if b != "pdfplumber"]
+    for name in backends[1:]:
+        if not available(name):
+            print(f"{name}: not installed, left out")
+    backends = [b for b in backends if b == "pdfplumber" or available(b)]
+
+    # stats[module][backend] = [pages, seconds, identical pages, files, identical files]
+    stats = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0, 0, 0]))
+    for path in args.files:
+        if not path.lower().endswith(".pdf"):
+            continue
+        with ParsedDocument(path) as doc:
+            first_line = get_first_line(doc, ref.cinema_map, mode="page")
+        route = ref.route(first_line) if first_line is not None else None
+        if route is None or route[3] is None:
+            print("not routed, left out:", path)
+            continue
+        _, _, exhibitor, module = route
+        family = module.__name__.rsplit(".", 1)[-1]
+        fetch_args = module_args(exhibitor, ref)
+
+        reference, _ = extract_all("pdfplumber", path)
+        reference_rows = parse_rows("pdfplumber", path, module, fetch_args)
+        for name in backends:
+            texts, seconds = extract_all(name, path)
+            rows = parse_rows(name, path, module, fetch_args)
+            entry = stats[family][name]
+            entry[0] += len(texts)
+            entry[1] += seconds
+            entry[2] += sum(1 for a, b in zip(reference, texts) if a == b)
+            entry[3] += 1
+            entry[4] += int(rows is not None and reference_rows is not None and rows.equals(reference_rows))
+
+    print(f"{'module':22s} {'backend':10s} {'pages':>6s} {'pages/sec':>10s} {'same text':>10s} {'same rows':>10s}")
+    for family in sorted(stats):
+        for name in backends:
+            pages, seconds, same_pages, files, same_files = stats[family][name]
+            rate = pages / seconds if seconds else 0
+            print(f"{family:22s} {name:10s} {pages:6d} {rate:10.1f} "
+                  f"{same_pages:5d}/{pages:<4d} {same_files:5d}/{files:<4d}")
+
+
+if __name__ == "__main__":
+    main()
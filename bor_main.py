@@ -1,21 +1,26 @@
 
 import streamlit as st
-import pdfplumber
 import os
 import pandas as pd
 import re
+import hashlib
+import time
+import signal
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+import multiprocessing
+from collections import Counter, OrderedDict
+from multiprocessing.connection import wait
 from datetime import datetime
 from openpyxl import load_workbook
+from openpyxl.packaging.custom import StringProperty
 from rapidfuzz import process, fuzz
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-
-@st.cache_resource
-def load_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
-
-model = load_model()
+from alias_store import get_alias_store
+from page_cache import get_page_cache
+from result_cache import get_result_cache
+from matcher_backends import MATCHER_BACKEND, get_model, prewarm_model, make_backend, BACKENDS
 
 # Import all modules ONCE
 from modules import (
@@ -37,6 +42,9 @@ from modules import (
     bahrain_epix
     
 )
+from modules.document import open_document
+from modules.specs import spec_for
+from modules.text_backends import backend_for, CHECK_PAGES
 
 
 
@@ -94,6 +102,97 @@ def find_last_real_row(ws):
     return last
 
 
+# --------------------------
+# APPEND CURSORS
+# --------------------------
+# The last populated row of every output sheet is kept in the workbook's custom document
+# properties as "last_row,max_row", so an append does not have to walk the whole sheet.
+# The stored max_row lets us notice rows added or deleted outside this tool.
+CURSOR_PREFIX = "BOR cursor: "
+
+
+def read_cursor(wb, sheet_name):
+    props = getattr(wb, "custom_doc_props", None)
+    if props is None or CURSOR_PREFIX + sheet_name not in props.names:
+        return None
+    try:
+        last_row, max_row = (int(v) for v in str(props[CURSOR_PREFIX + sheet_name].value).split(","))
+    except ValueError:
+        return None
+    return last_row, max_row
+
+
+def write_cursor(wb, ws, last_row):
+    props = getattr(wb, "custom_doc_props", None)
+    if props is None:
+        return
+    name = CURSOR_PREFIX + ws.title
+    if name in props.names:
+        del props[name]
+    props.append(StringProperty(name=name, value=f"{last_row},{ws.max_row}"))
+
+
+def row_has_data(ws, row_idx):
+    for row in ws.iter_rows(min_row=row_idx, max_row=row_idx, values_only=True):
+        return any(v not in (None, "") for v in row)
+    return False
+
+
+def last_populated_row(wb, ws):
+    """
+    Last row with data in ws: taken from the stored cursor when it still matches the sheet,
+    otherwise from a full find_last_real_row scan.
+    """
+    cursor = read_cursor(wb, ws.title)
+    if cursor is not None:
+        last_row, max_row = cursor
+        if (
+            max_row == ws.max_row
+            and 0 <= last_row <= max_row
+            and (last_row == 0 or row_has_data(ws, last_row))
+            and (last_row == max_row or not row_has_data(ws, last_row + 1))
+        ):
+            return last_row
+
+    return find_last_real_row(ws)
+
+
+# --------------------------
+# WORKBOOK ID
+# --------------------------
+# A random id kept in the output workbook's custom document properties, next to the
+# append cursors. Learned movie aliases are stored per workbook id: one BOR workbook
+# cannot see or prune the aliases of another.
+WORKBOOK_ID_PROP = "BOR workbook id"
+
+
+def read_workbook_id(excel_path):
+    # straight from docProps/custom.xml, without loading the workbook
+    try:
+        with zipfile.ZipFile(excel_path) as z:
+            root = ET.fromstring(z.read("docProps/custom.xml"))
+    except (KeyError, OSError, zipfile.BadZipFile, ET.ParseError):
+        return None
+    for prop in root:
+        if prop.get("name") == WORKBOOK_ID_PROP:
+            return "".join(prop.itertext()).strip() or None
+    return None
+
+
+def write_workbook_id(wb, workbook_id):
+    props = getattr(wb, "custom_doc_props", None)
+    if props is None or WORKBOOK_ID_PROP in props.names:
+        return
+    props.append(StringProperty(name=WORKBOOK_ID_PROP, value=workbook_id))
+
+
+def save_workbook_id(excel_path, workbook_id):
+    # process_pdf's path, which has no workbook held open to add it to
+    wb = load_workbook(excel_path)
+    write_workbook_id(wb, workbook_id)
+    wb.save(excel_path)
+
+
 def append_to_excel(excel_path, sheet_name, new_df):
     if len(new_df) == 0:
         #print("⚠️ new_df is EMPTY → nothing to append")
@@ -103,7 +202,7 @@ def append_to_excel(excel_path, sheet_name, new_df):
     ws = wb[sheet_name]
 
     # find first free row
-    last_row = find_last_real_row(ws)
+    last_row = last_populated_row(wb, ws)
     start_row = last_row + 1
 
     # write dataframe without overwriting anything
@@ -111,10 +210,46 @@ def append_to_excel(excel_path, sheet_name, new_df):
         for c_idx, value in enumerate(row, start=1):
             ws.cell(row=start_row + r_idx, column=c_idx, value=value)
 
+    write_cursor(wb, ws, start_row + new_df.index.max())
     wb.save(excel_path)
     #print("✔ Appended", len(new_df), "rows")
 
 
+class OutputWorkbook:
+    """
+    The output workbook held open for a whole batch. Rows are staged per sheet and
+    written below the last populated row of each sheet on save().
+    """
+
+    def __init__(self, excel_path):
+        self.excel_path = excel_path
+        self.wb = load_workbook(excel_path)
+        self.pending = {}
+        self.staged_counts = {}
+
+    def stage(self, sheet_name, new_df):
+        if len(new_df) == 0:
+            return
+        # copy the values now, the caller may keep changing the frame
+        rows = list(new_df.itertuples(index=False, name=None))
+        self.pending.setdefault(sheet_name, []).extend(rows)
+        self.staged_counts[sheet_name] = self.staged_counts.get(sheet_name, 0) + len(rows)
+
+    def save(self):
+        for sheet_name, rows in self.pending.items():
+            ws = self.wb[sheet_name]
+            start_row = last_populated_row(self.wb, ws) + 1
+
+            for r_idx, row in enumerate(rows):
+                for c_idx, value in enumerate(row, start=1):
+                    ws.cell(row=start_row + r_idx, column=c_idx, value=value)
+
+            write_cursor(self.wb, ws, start_row + len(rows) - 1)
+
+        self.pending = {}
+        self.wb.save(self.excel_path)
+
+
 def get_sheet_name(row):
 
     week = row["Week Type"]
@@ -182,31 +317,226 @@ def clean_title(t):
 
     return " ".join(t.split()).strip()
     
-def map_movie1(name, movie_list, threshold=0.65):
+class MovieCatalog:
+    """
+    The "Movies" catalog prepared for matching, with a memo of every name already mapped.
+
+    Names go through four tiers and only what a tier cannot resolve reaches the next one:
+      1. exact   - clean_title / normalize_title_old key lookup in a dict
+      2. alias   - raw titles learned in earlier runs for the same exhibitor and output
+                   workbook (AliasStore)
+      3. fuzzy   - rapidfuzz cdist over the clean titles, accepted above FUZZY_CUTOFF
+      4. embedding - similarity from the matcher backend (threshold + prefix fallback):
+                     sentence-transformer, or character n-gram TF-IDF without torch
+    The backend is only built when tier 4 is reached. A threshold of None means the
+    backend's own (0.65 for the transformer). Fuzzy hits, and embedding hits scoring
+    ALIAS_MIN_SCORE or more, are saved as aliases; an exact hit drops the alias of its
+    raw title, learned before the catalog had the title.
+    """
+
+    FUZZY_CUTOFF = 95
+    ALIAS_MIN_SCORE = 0.85
+    TIERS = ("exact", "alias", "fuzzy", "embedding")
+
+    def __init__(self, movie_list, aliases=None, backend=None, workbook=""):
+        self.movie_list = list(movie_list)
+        self.backend_name = backend or MATCHER_BACKEND
+        self.movie_set = set(self.movie_list)
+        self.aliases = aliases
+        self.workbook = workbook
+        if aliases is not None:
+            removed = aliases.prune(workbook, self.movie_list)
+            if removed:
+                print("Dropped aliases of removed movies:", removed)
+        self.clean_list = [clean_title(m) for m in self.movie_list]
+        self._backend = None
+        self._matches = {}
+
+        # first catalog entry wins on duplicate clean titles, like argmax does
+        self.clean_keys = {}
+        for idx, key in enumerate(self.clean_list):
+            if key:
+                self.clean_keys.setdefault(key, idx)
+
+        # old-style keys are only trusted when they point at a single title
+        self.old_keys = {}
+        ambiguous = set()
+        for idx, m in enumerate(self.movie_list):
+            key = normalize_title_old(m)
+            if not key or key in ambiguous:
+                continue
+            if key in self.old_keys and self.movie_list[self.old_keys[key]] != m:
+                del self.old_keys[key]
+                ambiguous.add(key)
+                continue
+            self.old_keys.setdefault(key, idx)
+
+        self.stats = {tier: {"names": 0, "hits": 0, "seconds": 0.0} for tier in self.TIERS}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = make_backend(self.clean_list, self.backend_name)
+        return self._backend
+
+    def match(self, name, threshold=None, exhibitor=None):
+        if not name or not self.movie_list:
+            return name
+        return self.match_many([name], threshold, exhibitor)[name]
+
+    def match_many(self, names, threshold=None, exhibitor=None):
+        """
+        Maps every distinct name in one go and returns {name: mapped name}.
+        """
+        if threshold is None:
+            threshold = BACKENDS[self.backend_name].threshold
+
+        result = {}
+        todo = []
+        for name in dict.fromkeys(names):
+            if not name or not self.movie_list:
+                result[name] = name
+            elif (name, threshold, exhibitor) in self._matches:
+                result[name] = self._matches[(name, threshold, exhibitor)]
+            else:
+                todo.append(name)
+
+        clean_names = {n: clean_title(n) for n in todo}
+
+        for tier, run in (
+            ("exact", lambda names, clean: self._match_exact(names, clean, exhibitor)),
+            ("alias", lambda names, clean: self._match_alias(names, exhibitor)),
+            ("fuzzy", self._match_fuzzy),
+            ("embedding", lambda names, clean: self._match_embedding(names, clean, threshold)),
+        ):
+            if not todo:
+                break
+
+            start = time.time()
+            found, confident = run(todo, clean_names)
+            stats = self.stats[tier]
+            stats["seconds"] += time.time() - start
+            stats["names"] += len(todo)
+            stats["hits"] += len(found)
+
+            if self.aliases is not None and confident:
+                self.aliases.remember(self.workbook, exhibitor, {n: found[n] for n in confident}, tier)
+
+            for name, mapped in found.items():
+                self._matches[(name, threshold, exhibitor)] = mapped
+                result[name] = mapped
+            todo = [n for n in todo if n not in found]
+
+        return result
+
+    # each tier returns ({name: mapped name}, names confident enough to learn as aliases)
+
+    def _match_alias(self, names, exhibitor):
+        if self.aliases is None:
+            return {}, []
+        found = {
+            name: bor_title
+            for name, bor_title in self.aliases.lookup(self.workbook, exhibitor, names).items()
+            if bor_title in self.movie_set
+        }
+        return found, []
+
+    def _match_exact(self, names, clean_names, exhibitor):
+        found = {}
+        for name in names:
+            idx = self.clean_keys.get(clean_names[name])
+            if idx is None:
+                idx = self.old_keys.get(normalize_title_old(name))
+            if idx is not None:
+                found[name] = self.movie_list[idx]
+        # not learned: the catalog answers them, and an alias learned before the title
+        # was added to it is stale
+        if self.aliases is not None and found:
+            self.aliases.forget(self.workbook, exhibitor, list(found))
+        return found, []
+
+    def _match_fuzzy(self, names, clean_names):
+        queries = [clean_names[n] for n in names]
+        scores = process.cdist(
+            queries, self.clean_list,
+            scorer=fuzz.ratio,
+            score_cutoff=self.FUZZY_CUTOFF,
+            workers=-1
+        )
+
+        best_idx = np.argmax(scores, axis=1)
+        best_score = scores[np.arange(len(names)), best_idx]
+
+        found = {
+            name: self.movie_list[int(idx)]
+            for name, idx, score in zip(names, best_idx, best_score)
+            if score >= self.FUZZY_CUTOFF
+        }
+        return found, list(found)
+
+    def _match_embedding(self, names, clean_names, threshold):
+        # one encode call for all leftovers, one matrix multiply and a row-wise argmax
+        queries = [clean_names[n] for n in names]
+        sims = self.backend.similarity(queries)
+
+        best_idx = np.argmax(sims, axis=1)
+        best_score = sims[np.arange(len(names)), best_idx]
+
+        found = {
+            name: self._resolve(name, clean_name, int(idx), score, threshold)
+            for name, clean_name, idx, score in zip(names, queries, best_idx, best_score)
+        }
+        confident = [
+            name for name, score in zip(names, best_score)
+            if score >= max(threshold, self.ALIAS_MIN_SCORE)
+        ]
+        return found, confident
+
+    def _resolve(self, name, clean_name, best_idx, best_score, threshold):
+        if best_score >= threshold:
+            return self.movie_list[best_idx]
+        # Safe prefix fallback
+
+        for m, clean_m in zip(self.movie_list, self.clean_list):
+            if clean_m.startswith(clean_name + " "):
+                return m
 
-    if not name or not movie_list:
         return name
 
-    clean_name = clean_title(name)
-    clean_list = [clean_title(m) for m in movie_list]
+    def tier_report(self):
+        lines = []
+        for tier in self.TIERS:
+            stats = self.stats[tier]
+            rate = stats["hits"] / stats["names"] * 100 if stats["names"] else 0
+            label = f"{tier} ({self.backend_name})" if tier == "embedding" else tier
+            lines.append(
+                f"{label}: {stats['hits']}/{stats['names']} names ({rate:.0f}%) in {stats['seconds']:.3f}s"
+            )
+        return " | ".join(lines)
 
-    name_vec = model.encode([clean_name], normalize_embeddings=True)
-    catalog_vecs = model.encode(clean_list, normalize_embeddings=True)
 
-    sims = cosine_similarity(name_vec, catalog_vecs)[0]
+def map_movie1(name, movie_list, threshold=None, catalog=None):
 
-    best_idx = int(np.argmax(sims))
-    best_score = sims[best_idx]
+    if not name or not movie_list:
+        return name
 
-    if best_score >= threshold:
-        return movie_list[best_idx]
-    # Safe prefix fallback
+    # without a prebuilt catalog the whole movie list is embedded for this one name
+    if catalog is None:
+        catalog = MovieCatalog(movie_list)
 
-    for m in movie_list:
-        if clean_title(m).startswith(clean_name + " "):
-            return m
+    return catalog.match(name, threshold)
 
-    return name
+
+def map_movies(names, movie_list, threshold=None, catalog=None, exhibitor=None):
+    """
+    Batched map_movie1 for a whole column: each distinct raw title is mapped once and the
+    result broadcast back to the rows.
+    """
+    if catalog is None:
+        catalog = MovieCatalog(movie_list)
+
+    mapping = catalog.match_many(names.tolist(), threshold, exhibitor)
+    return names.map(mapping)
 
 
 def map_movie_old(name, movie_list, threshold=80):
@@ -238,6 +568,9 @@ def map_movie_V0(name, movie_list, threshold=0.65):
         return name
 
     # Encode input + catalog
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    model = get_model()
     name_vec = model.encode([name], normalize_embeddings=True)
     catalog_vecs = model.encode(movie_list, normalize_embeddings=True)
 
@@ -340,31 +673,53 @@ def fix_dates1(file_df, date_format_map):
 
 
 
-def get_first_line(file_path,cinema_map):  #chekc if file is pdf or excel and treat differently
+# Routing reads only the top of page 0 ("header") or the whole first page ("page").
+ROUTING_MODE = os.environ.get("EMPIRE_BOR_ROUTING", "header")
+# header region as fractions of the page: x0, top, x1, bottom
+HEADER_BBOX = tuple(float(v) for v in os.environ.get("EMPIRE_BOR_HEADER_BBOX", "0,0,1,0.2").split(","))
+
+
+def read_excel_cell(file_path, row, col):
+    # one cell of the first sheet, without loading the rest of the workbook
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for values in ws.iter_rows(min_row=row, max_row=row, min_col=col, max_col=col, values_only=True):
+            return values[0]
+        return None
+    finally:
+        wb.close()
+
+
+def get_first_line(doc,cinema_map,mode=None):  #chekc if file is pdf or excel and treat differently
+    # doc: the file's ParsedDocument, page 0 extracted here is reused by the exhibitor module
+    file_path = doc.path
     ext = os.path.splitext(file_path)[1].lower()
     text=""
     # PDF
     if ext == ".pdf":
         try:
-            with pdfplumber.open(file_path) as pdf:
-                page_text = pdf.pages[0].extract_text() or ""
-                lines = [l.strip() for l in page_text.split("\n") if l.strip()]
-    
-                text = lines[0].replace(
-                    "Distributors by Film and Ticket Type", ""
-                ).strip()
-    
-                if text == "Ticket Types Per Title" and len(lines) > 3:
-                    text = lines[3].replace("Selection", "").strip()
-                
-                
-                
-                if text.upper() == "AL MARIAH MALL ABU DHABHI":
-                    
-                    text = text.upper() + " " + lines[1].upper()
+            if (mode or ROUTING_MODE) == "header":
+                page_text = doc.header_text(HEADER_BBOX)
+            else:
+                page_text = doc.page_text(0)
+            lines = [l.strip() for l in page_text.split("\n") if l.strip()]
+
+            text = lines[0].replace(
+                "Distributors by Film and Ticket Type", ""
+            ).strip()
+
+            if text == "Ticket Types Per Title" and len(lines) > 3:
+                text = lines[3].replace("Selection", "").strip()
             
-    
-                return text
+            
+            
+            if text.upper() == "AL MARIAH MALL ABU DHABHI":
+                
+                text = text.upper() + " " + lines[1].upper()
+        
+
+            return text
     
         except Exception:
             return None
@@ -373,8 +728,11 @@ def get_first_line(file_path,cinema_map):  #chekc if file is pdf or excel and tr
     # EXCEL
     elif ext in [".xlsx", ".xls"]:
         try:
-            df = pd.read_excel(file_path, header=None)
-            cell_value = str(df.iloc[6, 1]).strip()
+            if ext == ".xlsx":
+                cell_value = str(read_excel_cell(file_path, 7, 2)).strip()   # B7
+            else:
+                df = pd.read_excel(file_path, header=None)
+                cell_value = str(df.iloc[6, 1]).strip()
             if cell_value.upper() in cinema_map:
                 return cell_value   # matched → return mapped value
             else:
@@ -387,89 +745,16 @@ def get_first_line(file_path,cinema_map):  #chekc if file is pdf or excel and tr
 
 
 
-def process_pdf(pdf_path, excel_path):
-
-
-    #file_df=pd.DataFrame()
-    now_value = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # read the mapping sheet
-    mapping_df = pd.read_excel(
-        excel_path,
-        sheet_name="Cinemas Mapping",
-        usecols=["Name from File", "Line", "Exhibitor", "Country","BOR File",	"BOR Exhibitor","File Date Format"]
-    )
-    movies_df = pd.read_excel(
-        excel_path,
-        sheet_name="Movies",
-        usecols=["BOR Movie Name"]
-    )
-    
-    
-    movie_list = (
-        movies_df["BOR Movie Name"]
-        .dropna()
-        .astype(str)
-        .unique()
-        .tolist()
-    )
-    
-    format_df = pd.read_excel(
-    excel_path,
-    sheet_name="Format",
-    usecols=["PDF", "BOR"]
-    )
-    
-    format_map = (
-    format_df
-    .dropna(subset=["PDF", "BOR"])
-    .assign(
-        PDF=lambda d: d["PDF"].astype(str).str.strip().str.upper()
-    )
-    .set_index("PDF")["BOR"]
-    .to_dict()
-    )
-    
-
-
-    cinema_df = pd.read_excel(
-        excel_path,
-        sheet_name="Cinemas Mapping",
-        usecols=["Name from File", "BOR File", "BOR Exhibitor"]
-    )
-    
-    cinema_map = (
-        cinema_df
-        .dropna(subset=["Name from File", "BOR File"])
-        .assign(
-            PDF=lambda d: d["Name from File"].astype(str).str.strip().str.upper()
-        )
-        .set_index("PDF")["BOR File"]
-        .to_dict()
-    )
-
-    
-    exhibitor_map = (
-        cinema_df
-        .dropna(subset=["Name from File", "BOR Exhibitor"])
-        .assign(
-            PDF=lambda d: d["Name from File"].astype(str).str.strip().str.upper()
-        )
-        .set_index("PDF")["BOR Exhibitor"]
-        .to_dict()
-    )
+# --------------------------
+# REFERENCE DATA SNAPSHOT
+# --------------------------
+REFERENCE_SHEETS = {
+    "Cinemas Mapping": ["Name from File", "Line", "Exhibitor", "Country", "BOR File", "BOR Exhibitor", "File Date Format"],
+    "Movies": ["BOR Movie Name"],
+    "Format": ["PDF", "BOR"],
+}
 
-    date_format_map = (
-        mapping_df
-        .dropna(subset=["Name from File", "File Date Format"])
-        .assign(
-            KEY=lambda d: d["Name from File"].astype(str).str.strip().str.upper()
-        )
-        .set_index("KEY")["File Date Format"]
-        .to_dict()
-    )
-    
-    country_map = {
+country_map = {
     "Lebanon": "LB",
     "Jordan": "JO",
     "Iraq": "IQ",
@@ -486,48 +771,267 @@ def process_pdf(pdf_path, excel_path):
     "Palestine": "PA",
 }
 
-    
+# excel_path -> ReferenceData, so repeated loads of an unchanged workbook are free. The app
+# saves every upload to a new temp path, so a snapshot is also found by its content_hash,
+# and only the REFERENCE_CACHE_SIZE most recently loaded are kept
+_reference_cache = OrderedDict()
+REFERENCE_CACHE_SIZE = 2
 
 
-    first_line = get_first_line(pdf_path,cinema_map)
+def workbook_stamp(excel_path):
+    st_ = os.stat(excel_path)
+    return (st_.st_mtime_ns, st_.st_size)
 
-    if first_line is None:
-        return
 
+def _key_map(df, value_col):
+    return (
+        df
+        .dropna(subset=["Name from File", value_col])
+        .assign(
+            KEY=lambda d: d["Name from File"].astype(str).str.strip().str.upper()
+        )
+        .set_index("KEY")[value_col]
+        .to_dict()
+    )
 
-    # Find matching cinema
-    cinema_found = None
-    cinema_country = None
-    exhibitor = None
-    first_line_upper = first_line.upper()
-    #if first_line_upper == "AL MARIAH MALL ABU DHABHI":
-    #    first_line_upper = first_line_upper + " " + text.split("\n")[1].strip().upper()
-
-
-    for _, row in mapping_df.iterrows():
-        cinema_name = str(row["Name from File"]).upper()
-        if cinema_name == first_line_upper:
-            #st.write(cinema_name)
-            cinema_found = cinema_name
-            cinema_country = row["Country"]
-            exhibitor = row["Exhibitor"]
+
+def _route_index(df):
+    """
+    Normalised "Name from File" -> (name, Country, Exhibitor, module). The first row of a
+    name wins, as in the sheet order; module is None when module_map has no such exhibitor.
+    """
+    routes = {}
+    for name, country, exhibitor in df[["Name from File", "Country", "Exhibitor"]].itertuples(index=False):
+        if pd.isna(name):
+            continue
+        key = str(name).strip().upper()
+        if key not in routes:
+            routes[key] = (key, country, exhibitor, module_map.get(f"{country} {exhibitor}".strip()))
+    return routes
+
+
+class ReferenceData:
+    """
+    Everything process_pdf needs from the mapping sheets of the output workbook
+    ("Cinemas Mapping", "Movies", "Format"), read once and shared by every file of a batch.
+    """
+
+    def __init__(self, mapping_df, movies_df, format_df, stamp=None, workbook_id=None):
+        self.mapping_df = mapping_df
+        self.stamp = stamp
+        # a workbook without an id gets one, written to it by process_batch / process_pdf
+        # before any alias learned under it could be lost
+        self.workbook_id = workbook_id or uuid.uuid4().hex
+        self.has_workbook_id = workbook_id is not None
+
+        # hash of the mapping sheets only: appending output rows must not count as a change
+        digest = hashlib.sha256()
+        for df in (mapping_df, movies_df, format_df):
+            digest.update(df.to_csv(index=False).encode("utf-8"))
+        self.content_hash = digest.hexdigest()
+
+        self.movie_list = (
+            movies_df["BOR Movie Name"]
+            .dropna()
+            .astype(str)
+            .unique()
+            .tolist()
+        )
+
+        self.format_map = (
+            format_df
+            .dropna(subset=["PDF", "BOR"])
+            .assign(
+                PDF=lambda d: d["PDF"].astype(str).str.strip().str.upper()
+            )
+            .set_index("PDF")["BOR"]
+            .to_dict()
+        )
+
+        self.cinema_map = _key_map(mapping_df, "BOR File")
+        self.exhibitor_map = _key_map(mapping_df, "BOR Exhibitor")
+        self.date_format_map = _key_map(mapping_df, "File Date Format")
+        self.country_map = country_map
+        self.routes = _route_index(mapping_df)
+        self.unrouted = []          # (file, first line) skipped by route(), reset per batch
+        self.failed = []            # (file, reason) of files that errored or ran over budget
+        self.stopped = []           # (file, last page read, pages skipped, page count) of
+                                    # files whose parser ended at its end-of-data line
+        self._movie_catalog = None
+
+    def route(self, first_line):
+        """
+        (name, Country, Exhibitor, module) of the cinema a file's first line names, or None.
+        """
+        return self.routes.get(first_line.strip().upper())
+
+    def __getstate__(self):
+        # sent to parse worker processes: the catalog stays in the parent, routes hold modules
+        state = self.__dict__.copy()
+        state["_movie_catalog"] = None
+        del state["routes"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.routes = _route_index(self.mapping_df)
+
+    @property
+    def movie_catalog(self):
+        # embedded on first use, then shared by every file mapped against this snapshot
+        if self._movie_catalog is None:
+            self._movie_catalog = MovieCatalog(
+                self.movie_list, aliases=get_alias_store(), workbook=self.workbook_id
+            )
+        return self._movie_catalog
+
+    @classmethod
+    def from_workbook(cls, excel_path):
+        stamp = workbook_stamp(excel_path)
+        # one parse of the workbook for all three sheets
+        sheets = pd.read_excel(excel_path, sheet_name=list(REFERENCE_SHEETS))
+        frames = [sheets[name][cols] for name, cols in REFERENCE_SHEETS.items()]
+        return cls(*frames, stamp=stamp, workbook_id=read_workbook_id(excel_path))
+
+
+def load_reference_data(excel_path, force=False):
+    """
+    Returns the ReferenceData for excel_path, re-reading the workbook only when its
+    mtime/size changed. A re-read whose mapping sheets hash the same as a cached snapshot
+    (the same path before, or another upload of the same workbook) keeps that snapshot,
+    so anything cached on it (the movie catalog) stays valid.
+    """
+    cached = _reference_cache.get(excel_path)
+    if cached is not None and not force and cached.stamp == workbook_stamp(excel_path):
+        _reference_cache.move_to_end(excel_path)
+        return cached
+
+    ref = ReferenceData.from_workbook(excel_path)
+    for path, snapshot in list(_reference_cache.items()):
+        if snapshot.content_hash == ref.content_hash and (
+            not ref.has_workbook_id or snapshot.workbook_id == ref.workbook_id
+        ):
+            # one entry per snapshot: the path it was last loaded from
+            del _reference_cache[path]
+            snapshot.stamp = ref.stamp
+            ref = snapshot
             break
 
-    if cinema_found is None:
+    _reference_cache.pop(excel_path, None)
+    _reference_cache[excel_path] = ref
+    while len(_reference_cache) > REFERENCE_CACHE_SIZE:
+        _reference_cache.popitem(last=False)
+    return ref
+
+
+def fetch_module_data(module, doc, *args):
+    """
+    module.fetch_data(doc, *args), served from the parsed result cache for a file that
+    was parsed before by the same PARSER_VERSION and module source.
+    """
+    cache = get_result_cache()
+    if cache is not None:
+        cached = cache.load(module, doc, *args)
+        if cached is not None:
+            return cached
+
+    extract_pages_parallel(doc, module)
+    file_df = module.fetch_data(doc, *args)
+    if doc.backend_rejected:
+        # the pages read before the fast text backend was rejected: all again from pdfplumber
+        doc.stopped = False
+        file_df = module.fetch_data(doc, *args)
+    if cache is not None:
+        cache.store(module, doc, file_df, *args)
+    return file_df
+
+
+# "spec": exhibitor modules with a declarative spec (modules/specs.py) are run by the spec
+# engine, "module": always the hand-written module
+PARSER_ENGINE = os.environ.get("EMPIRE_BOR_PARSERS", "spec")
+
+
+def exhibitor_parser(module):
+    """
+    What parses the files routed to module: its spec, or the module itself.
+    """
+    if PARSER_ENGINE == "spec":
+        return spec_for(module) or module
+    return module
+
+
+def module_args(exhibitor, ref):
+    """
+    Arguments of the exhibitor module's fetch_data after the document.
+    """
+    if exhibitor=="KNCC":
+        return exhibitor, ref.cinema_map
+    return (exhibitor,)
+
+
+def build_output(pdf_path, ref):
+    """
+    Parses one file and returns [(sheet name, DataFrame), ...] in the order the sheets
+    are written, or None when the file is skipped.
+    """
+    # opened once: routing and the exhibitor module share the extracted page text,
+    # pages of a report seen before come from the on-disk page text cache
+    with open_document(pdf_path, cache=get_page_cache()) as doc:
+        return build_document_output(doc, ref)
+
+
+def build_document_output(doc, ref):
+    parsed = parse_document(doc, ref)
+    if parsed is None:
+        return
+    return assemble_output(*parsed, ref)
+
+
+def parse_document(doc, ref):
+    """
+    Routing, the exhibitor module, date fixing and format/cinema mapping of one file.
+    Returns (file_df, exhibitor), or None when the file is skipped. Needs no movie
+    catalog, so it also runs in parse worker processes.
+    """
+    pdf_path = doc.path
+
+    #file_df=pd.DataFrame()
+    now_value = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    format_map = ref.format_map
+    cinema_map = ref.cinema_map
+    exhibitor_map = ref.exhibitor_map
+    date_format_map = ref.date_format_map
+
+    first_line = get_first_line(doc,cinema_map)
+
+    # Find matching cinema
+    route = ref.route(first_line) if first_line is not None else None
+    if route is None and ROUTING_MODE == "header" and doc.header_passes:
+        # the header crop missed: a report laid out lower than HEADER_BBOX, try the full page
+        first_line = get_first_line(doc,cinema_map,mode="page")
+        route = ref.route(first_line) if first_line is not None else None
+    if route is None:
+        # listed together at the end of the batch
+        ref.unrouted.append((pdf_path, first_line))
         print("No cinema match for:", pdf_path)
         return
 
-    # Call correct module
-    key = f"{cinema_country} {exhibitor}".strip()
-    #st.write(key)
-    module = module_map.get(key)
+    cinema_found, cinema_country, exhibitor, module = route
+    if module is None:
+        print("No exhibitor module for:", f"{cinema_country} {exhibitor}".strip(), pdf_path)
+        return
 
 
     try:
-        if exhibitor=="KNCC":
-            file_df = module.fetch_data(pdf_path, exhibitor,cinema_map)
-        else:
-            file_df = module.fetch_data(pdf_path, exhibitor)
+        doc.use_text_backend(backend_for(module), CHECK_PAGES)
+        file_df = fetch_module_data(exhibitor_parser(module), doc, *module_args(exhibitor, ref))
+
+        if doc.stopped and doc.pages_skipped:
+            # a report with data after its end-of-data line would lose rows: listed per file
+            ref.stopped.append((pdf_path, len(doc.pages_read), doc.pages_skipped, doc.page_count))
+            print(f"End of data on page {len(doc.pages_read)}, "
+                  f"{doc.pages_skipped} of {doc.page_count} pages skipped:", pdf_path)
 
         if file_df is None or len(file_df) == 0:
             print("Empty df, skipping:", pdf_path)
@@ -542,10 +1046,6 @@ def process_pdf(pdf_path, excel_path):
 
         file_df["Extraction Date"] = now_value
         file_df["Country"] = cinema_country
-        
-        file_df["Movie Mapped"] = file_df["Movie"].apply(
-            lambda x: map_movie1(x, movie_list)
-        )
 
         #file_df=fix_dates(file_df)
         file_df = fix_dates1(file_df, date_format_map)
@@ -576,9 +1076,26 @@ def process_pdf(pdf_path, excel_path):
             .map(cinema_map)
             .fillna(file_df["Cinema"])
         )
-        
+
+        return file_df, exhibitor
+
+    except Exception as e:
+        print("Error calling module:", e)
+        ref.failed.append((pdf_path, f"{type(e).__name__}: {e}"))
+        return None
 
 
+def assemble_output(file_df, exhibitor, ref):
+    """
+    Movie mapping and the BOR aggregations of a parsed file, in the process that owns
+    the movie catalog. Returns [(sheet name, DataFrame), ...].
+    """
+    country_map = ref.country_map
+
+    try:
+        file_df["Movie Mapped"] = map_movies(
+            file_df["Movie"], ref.movie_list, catalog=ref.movie_catalog, exhibitor=exhibitor
+        )
 
         EXPECTED_ORDER = [
               "File","Exhibitor","Cinema","Week Type","Extraction Date",
@@ -589,7 +1106,8 @@ def process_pdf(pdf_path, excel_path):
 
         file_df = file_df.reindex(columns=EXPECTED_ORDER)
 
-        append_to_excel(excel_path, "Raw Data", file_df)
+        # snapshot before the normalisation below changes file_df in place
+        raw_df = file_df.copy()
 
         # Normalize fields
         file_df["Week Type"] = file_df["Week Type"].fillna("").str.strip().str.lower()
@@ -670,11 +1188,415 @@ def process_pdf(pdf_path, excel_path):
 
 
 
-        # Write results
-        append_to_excel(excel_path, "Daily BOR", daily_agg)
-        append_to_excel(excel_path, "Daily BOR - Summary", daily_sum_agg)
-        append_to_excel(excel_path, "Weekly BOR", weekly_agg)
-        append_to_excel(excel_path, "Weekly BOR - Summary", weekly_sum_agg)
+        return [
+            ("Raw Data", raw_df),
+            ("Daily BOR", daily_agg),
+            ("Daily BOR - Summary", daily_sum_agg),
+            ("Weekly BOR", weekly_agg),
+            ("Weekly BOR - Summary", weekly_sum_agg),
+        ]
 
     except Exception as e:
-        print("Error calling module:", e)
+        print("Error building output:", e)
+        ref.failed.append((file_df["File"].iloc[0], f"{type(e).__name__}: {e}"))
+        return None
+
+
+def process_pdf(pdf_path, excel_path, ref=None):
+
+    # mapping sheets: pass the batch's snapshot in to skip re-reading the workbook per file
+    if ref is None:
+        ref = load_reference_data(excel_path)
+
+    output = build_output(pdf_path, ref)
+    if not ref.has_workbook_id:
+        # the aliases learned mapping this file are stored under the id: keep it, rows or not
+        save_workbook_id(excel_path, ref.workbook_id)
+        ref.has_workbook_id = True
+    if output is None:
+        return
+
+    # Write results
+    for sheet_name, df in output:
+        append_to_excel(excel_path, sheet_name, df)
+
+
+# Processes parsing files in process_batch. 0 = one per CPU, 1 = a single worker process.
+PARSE_WORKERS = int(os.environ.get("EMPIRE_BOR_WORKERS", "0"))
+# Budget of one file in a parse worker: seconds of wall clock, and MB of memory on top of
+# the worker's own, counting the page pool it may start. A worker over budget is killed,
+# with its page pool, and the file reported. 0 disables either.
+FILE_TIMEOUT = float(os.environ.get("EMPIRE_BOR_FILE_TIMEOUT", "300"))
+FILE_MEMORY_MB = int(os.environ.get("EMPIRE_BOR_FILE_MEMORY_MB", "0"))
+MEMORY_POLL = 0.2
+# Two-phase parse of long reports of modules with PAGE_PARALLEL (Vox): the page text of a
+# report of PAGE_PARALLEL_MIN pages or more is extracted in PAGE_WORKERS processes first,
+# then parsed in order. 0 = one per CPU, 1 disables it. In a batch the parse workers share
+# them: each starts at most PAGE_WORKERS / parse workers.
+PAGE_WORKERS = int(os.environ.get("EMPIRE_BOR_PAGE_WORKERS", "0"))
+PAGE_PARALLEL_MIN = int(os.environ.get("EMPIRE_BOR_PAGE_PARALLEL_MIN", "50"))
+
+_worker_ref = None
+_worker_page_workers = None # page pool size of a parse worker
+_worker_deadline = None     # end of the current file's time budget in a parse worker
+
+
+def extract_pages_parallel(doc, module):
+    """
+    Phase 1 for a long report of a PAGE_PARALLEL module, nothing otherwise. In a parse
+    worker the pool gets most of what is left of the file's time budget, so it is shut
+    down before the worker would be killed over it.
+    """
+    if PAGE_WORKERS == 1 or not getattr(module, "PAGE_PARALLEL", False):
+        return 0
+    if doc.page_count < PAGE_PARALLEL_MIN:
+        return 0
+
+    workers = _worker_page_workers or PAGE_WORKERS or os.cpu_count() or 1
+    timeout = FILE_TIMEOUT or None
+    if _worker_deadline is not None:
+        timeout = max(0.0, _worker_deadline - time.monotonic()) * 0.9
+    extracted = doc.extract_pages(workers, timeout=timeout)
+    if extracted:
+        print(f"Extracted {extracted} pages in {workers} processes:", doc.path)
+    return extracted
+
+
+def _init_parse_worker(ref, page_workers=None):
+    global _worker_ref, _worker_page_workers
+    _worker_ref = ref
+    _worker_page_workers = page_workers
+
+
+def _parse_in_worker(path, timeout=None):
+    """
+    parse_document for one file in a worker process. Returns the parsed file, the
+    unrouted, failed and stopped entries and the worker's cache counters for the parent
+    to merge.
+    """
+    global _worker_deadline
+    _worker_deadline = time.monotonic() + timeout if timeout else None
+    ref = _worker_ref
+    ref.unrouted.clear()
+    ref.failed.clear()
+    ref.stopped.clear()
+    caches = {"page": get_page_cache(), "result": get_result_cache()}
+    for cache in caches.values():
+        if cache is not None:
+            cache.reset_stats()
+
+    with open_document(path, cache=caches["page"]) as doc:
+        parsed = parse_document(doc, ref)
+
+    stats = {name: Counter(cache.stats) for name, cache in caches.items() if cache is not None}
+    return parsed, list(ref.unrouted), list(ref.failed), list(ref.stopped), stats
+
+
+def child_processes(pid):
+    """
+    Pids of the descendants of a process (a parse worker's page pool): psutil where
+    installed, else /proc. Empty when neither can tell.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    children = []
+    pending = [pid]
+    while pending:
+        parent = pending.pop()
+        try:
+            tasks = os.listdir(f"/proc/{parent}/task")
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                with open(f"/proc/{parent}/task/{task}/children") as f:
+                    found = [int(child) for child in f.read().split()]
+            except (OSError, ValueError):
+                continue
+            children.extend(found)
+            pending.extend(found)
+    return children
+
+
+def worker_memory(pid):
+    """
+    Resident set size of a process and its descendants in bytes: psutil where installed
+    (Windows, macOS), else /proc. None when neither can tell.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    total = 0
+    for index, process_id in enumerate([pid] + child_processes(pid)):
+        if psutil is not None:
+            try:
+                total += psutil.Process(process_id).memory_info().rss
+                continue
+            except psutil.Error:
+                pass
+        else:
+            try:
+                with open(f"/proc/{process_id}/statm") as f:
+                    total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+                continue
+            except (OSError, ValueError, IndexError, AttributeError):
+                pass
+        # a child may have exited since it was listed; the process itself must be measured
+        if index == 0:
+            return None
+    return total
+
+
+def _parse_worker_main(conn, ref, page_workers):
+    _init_parse_worker(ref, page_workers)
+    conn.send("ready")
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        try:
+            conn.send(("ok", _parse_in_worker(*task)))
+        except Exception as e:
+            conn.send(("failed", f"{type(e).__name__}: {e}"))
+
+
+class ParseWorker:
+    """
+    One worker process of iter_parsed, parsing the files sent to it one at a time.
+    Not a daemon, so that phase 1 of a long report (extract_pages_parallel) can start its
+    page pool in here, under the file's budget.
+    """
+
+    def __init__(self, context, ref, page_workers=None):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_parse_worker_main, args=(child_conn, ref, page_workers), daemon=False
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False      # set once the worker has imported everything
+        self.task = None        # index of the file being parsed
+        self.base_memory = None # resident size when the file was sent, the budget is on top
+        self.deadline = None
+
+    def send(self, index, path, timeout):
+        self.task = index
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.base_memory = worker_memory(self.process.pid)
+        self.conn.send((path, timeout))
+
+    def memory_used(self):
+        current = worker_memory(self.process.pid)
+        if current is None or self.base_memory is None:
+            return 0
+        return current - self.base_memory
+
+    def receive(self):
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            return None
+
+    def kill(self):
+        # the page pool first: it would outlive the worker until its next result
+        for pid in child_processes(self.process.pid):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+
+
+def parse_workers(workers, file_count):
+    if not workers:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, file_count))
+
+
+def iter_parsed(paths, ref, workers, timeout=None, memory_mb=None):
+    """
+    Yields (path, parsed) in the order of paths, parsed by parse_document in `workers`
+    processes. Workers keep going while an earlier file is still parsing: a slow file
+    holds back only the yielding, and the batch is staged in memory until saved anyway.
+    A file over its time or memory budget, or whose worker dies, yields None and is
+    added to ref.failed; its worker, with any page pool, is killed and replaced. Memory
+    is polled every MEMORY_POLL seconds, where worker_memory can measure it.
+    """
+    timeout = FILE_TIMEOUT if timeout is None else timeout
+    memory_mb = FILE_MEMORY_MB if memory_mb is None else memory_mb
+    if memory_mb and worker_memory(os.getpid()) is None:
+        print(f"Memory budget of {memory_mb} MB not enforced: install psutil to measure "
+              f"worker memory on this platform")
+        memory_mb = 0
+    page_cache = get_page_cache()
+    result_cache = get_result_cache()
+
+    # the CPUs left for phase 1 of long reports, split between the workers
+    page_workers = max(1, (PAGE_WORKERS or os.cpu_count() or 1) // workers)
+
+    # spawn: the app process runs threads (streamlit, model prewarm) that fork would copy
+    context = multiprocessing.get_context("spawn")
+    pool = [ParseWorker(context, ref, page_workers) for _ in range(workers)]
+    outcomes = {}
+    next_send = next_yield = 0
+
+    try:
+        while next_yield < len(paths):
+            while next_yield in outcomes:
+                path = paths[next_yield]
+                status, value = outcomes.pop(next_yield)
+                next_yield += 1
+
+                if status != "ok":
+                    print("Parse failed:", path, value)
+                    ref.failed.append((path, value))
+                    yield path, None
+                    continue
+
+                parsed, unrouted, failed, stopped, stats = value
+                ref.unrouted.extend(unrouted)
+                ref.failed.extend(failed)
+                ref.stopped.extend(stopped)
+                for name, cache in (("page", page_cache), ("result", result_cache)):
+                    if cache is not None:
+                        cache.stats.update(stats.get(name, {}))
+                yield path, parsed
+
+            for worker in pool:
+                if worker.ready and worker.task is None and next_send < len(paths):
+                    worker.send(next_send, paths[next_send], timeout)
+                    next_send += 1
+
+            if next_yield >= len(paths):
+                break
+
+            deadlines = [w.deadline for w in pool if w.deadline is not None]
+            wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            if memory_mb and any(w.task is not None for w in pool):
+                wait_for = MEMORY_POLL if wait_for is None else min(wait_for, MEMORY_POLL)
+            wait([w.conn for w in pool] + [w.process.sentinel for w in pool], timeout=wait_for)
+
+            for i, worker in enumerate(pool):
+                if worker.conn.poll():
+                    message = worker.receive()
+                    if message == "ready":
+                        worker.ready = True
+                    elif message is not None:
+                        outcomes[worker.task] = message
+                        worker.task = worker.deadline = None
+
+                if not worker.process.is_alive():
+                    if not worker.ready:
+                        raise RuntimeError(f"Parse worker failed to start (exit code {worker.process.exitcode})")
+                    if worker.task is not None:
+                        outcomes[worker.task] = ("failed", f"worker exited with code {worker.process.exitcode}")
+                elif worker.deadline is not None and time.monotonic() >= worker.deadline:
+                    outcomes[worker.task] = ("failed", f"over the {timeout:g}s time budget")
+                elif (memory_mb and worker.task is not None
+                        and worker.memory_used() > memory_mb * 1024 * 1024):
+                    outcomes[worker.task] = ("failed", f"over the {memory_mb} MB memory budget")
+                else:
+                    continue
+
+                worker.kill()
+                pool[i] = ParseWorker(context, ref, page_workers)
+    finally:
+        for worker in pool:
+            worker.stop()
+
+
+def process_batch(paths, excel_path, ref=None, on_progress=None, workers=None):
+    """
+    Processes every file in paths against one open copy of the output workbook.
+    Rows for all sheets are staged in memory and the workbook is saved once at the end.
+    on_progress(idx, total, path) is called after each file.
+
+    With more than one worker (workers, else PARSE_WORKERS), or a per-file budget
+    (FILE_TIMEOUT / FILE_MEMORY_MB), files are parsed in worker processes; movie mapping,
+    aggregation and the workbook stay in this process, and files are staged in the order
+    of paths, so the output matches a serial run. A worker extracts the page text of a
+    long Vox report in a page pool of its own, inside the file's budget.
+    """
+    if ref is None:
+        ref = load_reference_data(excel_path)
+
+    out = OutputWorkbook(excel_path)
+    write_workbook_id(out.wb, ref.workbook_id)
+    total = len(paths)
+
+    # hit/miss counters cover this batch
+    page_cache = get_page_cache()
+    result_cache = get_result_cache()
+    for cache in (page_cache, result_cache):
+        if cache is not None:
+            cache.reset_stats()
+    ref.unrouted.clear()
+    ref.failed.clear()
+    ref.stopped.clear()
+
+    workers = parse_workers(PARSE_WORKERS if workers is None else workers, total)
+    if workers > 1 or FILE_TIMEOUT > 0 or FILE_MEMORY_MB > 0:
+        outputs = (
+            (path, assemble_output(*parsed, ref) if parsed is not None else None)
+            for path, parsed in iter_parsed(paths, ref, workers)
+        )
+    else:
+        outputs = ((path, build_output(path, ref)) for path in paths)
+
+    for idx, (path, output) in enumerate(outputs, start=1):
+        if output is not None:
+            for sheet_name, df in output:
+                out.stage(sheet_name, df)
+
+        if on_progress is not None:
+            on_progress(idx, total, path)
+
+    out.save()
+    ref.has_workbook_id = True
+
+    if ref._movie_catalog is not None:
+        print("Movie mapping:", ref.movie_catalog.tier_report())
+    if page_cache is not None:
+        print("Page text:", page_cache.report())
+    if result_cache is not None:
+        print("Parsed results:", result_cache.report())
+    if ref.unrouted:
+        print(f"No cinema match for {len(ref.unrouted)} file(s):")
+        for path, first_line in ref.unrouted:
+            print(f"  {os.path.basename(path)}: {first_line!r}")
+    if ref.stopped:
+        print(f"Parsing ended at the end-of-data line of {len(ref.stopped)} file(s):")
+        for path, last_page, skipped, page_count in ref.stopped:
+            print(f"  {os.path.basename(path)}: page {last_page}, {skipped} of {page_count} pages skipped")
+    if ref.failed:
+        print(f"Failed to parse {len(ref.failed)} file(s):")
+        for path, reason in ref.failed:
+            print(f"  {os.path.basename(path)}: {reason}")
+
+    return out.staged_counts
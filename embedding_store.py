@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import uuid
+import numpy as np
+
+
+# Local cache folder, shared with the other on-disk caches of the app
+CACHE_DIR = os.environ.get(
+    "EMPIRE_BOR_CACHE",
+    os.path.join(os.path.expanduser("~"), ".empire_bor_cache")
+)
+
+
+# --------------------------
+# EMBEDDING STORE
+# --------------------------
+class EmbeddingStore:
+    """
+    clean title -> normalised embedding, kept on disk between runs.
+
+    Vectors live as raw float32 rows in a .f32 file (opened memory-mapped), the row of
+    every key in <model>.json together with the model name, vector size and that file's
+    name. Only keys that are not in the store yet are sent to the encoder, and their rows
+    are appended to the file. When the index is rewritten, keys no longer asked for
+    (titles removed from the catalog) are compacted away, into a new file the index then
+    points at.
+    """
+
+    def __init__(self, model_name, directory=None):
+        self.model_name = model_name
+        self.directory = os.path.join(directory or CACHE_DIR, "embeddings")
+
+        self.safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", model_name)
+        self.vectors_path = None
+        self.index_path = os.path.join(self.directory, self.safe_name + ".json")
+
+        self.index = {}
+        self.dim = None
+        self.vectors = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            keys, dim = meta.get("keys", []), meta.get("dim")
+            if meta.get("model") != self.model_name or not keys or not dim or not meta.get("file"):
+                return
+            vectors_path = os.path.join(self.directory, os.path.basename(meta["file"]))
+            # rows past the index are an append the index never got: ignored
+            vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(keys), dim))
+        except (OSError, ValueError):
+            # a store written by another model, or a half-written one, is ignored
+            return
+
+        self.index = {k: i for i, k in enumerate(keys)}
+        self.dim = dim
+        self.vectors_path = vectors_path
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.index)
+
+    def get_many(self, keys, encode):
+        """
+        Returns the vectors of keys as one matrix (rows in the order of keys).
+        encode(list_of_new_keys) is only called for keys missing from the store.
+        """
+        missing = [k for k in dict.fromkeys(keys) if k not in self.index]
+        if missing:
+            self._add(missing, np.asarray(encode(missing), dtype=np.float32), keep=keys)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.asarray(self.vectors[[self.index[k] for k in keys]])
+
+    def _add(self, keys, new_vectors, keep):
+        keep = set(keep)
+        live = [k for k in self.index if k in keep]
+        if self.vectors_path is not None and len(live) == len(self.index):
+            rows, append_at = new_vectors, len(self.index)
+        else:
+            # titles removed from the catalog, or no file yet: a new file with the rows kept
+            kept = [np.asarray(self.vectors[[self.index[k] for k in live]])] if live else []
+            rows, append_at = np.concatenate(kept + [new_vectors]), None
+            self.index = {k: i for i, k in enumerate(live)}
+
+        offset = len(self.index)
+        for i, k in enumerate(keys):
+            self.index[k] = offset + i
+        self.dim = new_vectors.shape[1]
+
+        # drop the memory map before writing its file (Windows keeps it locked)
+        previous, self.vectors = self.vectors, None
+        try:
+            path = self._write_vectors(rows, append_at)
+            self._save_index(path)
+        except OSError as e:
+            print("Embedding store not saved:", e)
+            # kept in memory for this run, written whole by the next save
+            if append_at:
+                rows = np.concatenate([np.asarray(previous[:append_at]), rows])
+            self.vectors = rows
+            self.vectors_path = None
+            return
+
+        self.vectors_path = path
+        self.vectors = np.memmap(path, dtype=np.float32, mode="r", shape=(len(self.index), self.dim))
+
+    def _write_vectors(self, rows, append_at):
+        """
+        Appends rows after the first append_at rows of the current file, or, with
+        append_at None, writes them to a new file. Returns the file's path: the index
+        still names the old one until it is saved.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        rows = np.ascontiguousarray(rows, dtype=np.float32)
+        if append_at is None:
+            path = os.path.join(self.directory, f"{self.safe_name}.{uuid.uuid4().hex[:8]}.f32")
+            with open(path, "wb") as f:
+                f.write(rows.tobytes())
+            return path
+
+        with open(self.vectors_path, "r+b") as f:
+            # past the indexed rows: an earlier append that never made it into the index
+            f.seek(append_at * rows.shape[1] * rows.itemsize)
+            f.truncate()
+            f.write(rows.tobytes())
+        return self.vectors_path
+
+    def _save_index(self, vectors_path):
+        tmp_index = self.index_path + ".tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self.dim,
+                "file": os.path.basename(vectors_path),
+                "keys": list(self.index),
+            }, f)
+        os.replace(tmp_index, self.index_path)
+
+        # files the index no longer names: compacted away, or the .npy of earlier versions
+        own_file = re.compile(re.escape(self.safe_name) + r"(\.[0-9a-f]{8})?\.(f32|npy)")
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if own_file.fullmatch(name) and path != vectors_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    # still mapped by another process (Windows): removed on a later save
+                    pass
+
+
+_stores = {}
+
+
+def get_embedding_store(model_name):
+    if model_name not in _stores:
+        _stores[model_name] = EmbeddingStore(model_name)
+    return _stores[model_name]
@@ -0,0 +1,187 @@
+import os
+import threading
+import importlib.util
+import numpy as np
+import streamlit as st
+
+from embedding_store import get_embedding_store
+
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# How the transformer backend runs the model:
+#   "torch"     - sentence-transformers / PyTorch
+#   "onnx"      - ONNX Runtime on the exported fp32 model, no torch needed
+#   "onnx-int8" - ONNX Runtime on the int8-quantized export
+ENCODER = os.environ.get("EMPIRE_BOR_ENCODER", "torch")
+ONNX_THREADS = int(os.environ.get("EMPIRE_BOR_ONNX_THREADS", "0"))    # 0 = onnxruntime default
+ENCODE_BATCH_SIZE = int(os.environ.get("EMPIRE_BOR_BATCH_SIZE", "64"))
+# folder holding tokenizer.json and onnx/*.onnx for offline use, otherwise downloaded from the hub
+ONNX_MODEL_DIR = os.environ.get("EMPIRE_BOR_ONNX_DIR")
+
+ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+# "transformer" or "tfidf". Without any way to run the transformer (slim build) the
+# TF-IDF backend is the default.
+MATCHER_BACKEND = os.environ.get("EMPIRE_BOR_MATCHER") or (
+    "transformer"
+    if importlib.util.find_spec("sentence_transformers" if ENCODER == "torch" else "onnxruntime")
+    else "tfidf"
+)
+
+
+# --------------------------
+# ONNX ENCODER
+# --------------------------
+class OnnxEncoder:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime with the encode() signature of SentenceTransformer:
+    WordPiece tokenisation, mean pooling over the attention mask, optional L2 normalisation.
+    """
+
+    max_seq_length = 256
+
+    def __init__(self, model_name, variant="onnx", threads=0, model_dir=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        if model_dir:
+            tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+            model_path = os.path.join(model_dir, ONNX_FILES[variant])
+        else:
+            from huggingface_hub import hf_hub_download
+            repo = f"sentence-transformers/{model_name}"
+            tokenizer_path = hf_hub_download(repo, "tokenizer.json")
+            model_path = hf_hub_download(repo, ONNX_FILES[variant])
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, sentences, normalize_embeddings=False, batch_size=32, **kwargs):
+        chunks = [
+            self._encode_batch(sentences[i:i + batch_size])
+            for i in range(0, len(sentences), batch_size)
+        ]
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        vectors = np.concatenate(chunks)
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+        return vectors
+
+    def _encode_batch(self, sentences):
+        encoded = self.tokenizer.encode_batch(list(sentences))
+        feeds = {
+            "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64),
+        }
+        feeds = {k: v for k, v in feeds.items() if k in self.input_names}
+
+        token_vectors = self.session.run(None, feeds)[0]
+        mask = feeds["attention_mask"][:, :, None].astype(np.float32)
+        return (token_vectors * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def encoder_id():
+    # stamped on the embedding store: vectors from different encoders are not mixed
+    return MODEL_NAME if ENCODER == "torch" else f"{MODEL_NAME}-{ENCODER}"
+
+
+# The sentence-transformer (and torch behind it) is only loaded the first time an embedding
+# match is needed: opening the app, the ZIP page or runs resolved by the cheaper match
+# tiers never pay for it.
+@st.cache_resource
+def load_model():
+    if ENCODER != "torch":
+        return OnnxEncoder(MODEL_NAME, ENCODER, ONNX_THREADS, ONNX_MODEL_DIR)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model()
+    return _model
+
+
+def prewarm_model():
+    """
+    Starts loading the model in a background thread so the UI does not wait for it.
+    """
+    if _model is None and MATCHER_BACKEND == "transformer":
+        threading.Thread(target=get_model, daemon=True).start()
+
+
+def encode_titles(titles):
+    return get_model().encode(titles, normalize_embeddings=True, batch_size=ENCODE_BATCH_SIZE)
+
+
+# --------------------------
+# BACKENDS
+# --------------------------
+# A backend is fitted on the clean catalog titles once, then similarity(queries) returns a
+# dense (len(queries), len(catalog)) matrix of cosine similarities.
+
+class TransformerBackend:
+    name = "transformer"
+    threshold = 0.65
+
+    def __init__(self, catalog_titles):
+        # titles embedded in earlier runs come from the on-disk store, only new ones are encoded
+        self.vectors = get_embedding_store(encoder_id()).get_many(catalog_titles, encode_titles)
+
+    def similarity(self, queries):
+        return encode_titles(queries) @ self.vectors.T
+
+
+class TfidfBackend:
+    """
+    Character n-gram TF-IDF with sparse cosine similarity: no torch, fits a few thousand
+    titles in milliseconds. Scores run lower than the transformer's, hence its own threshold.
+    """
+    name = "tfidf"
+    threshold = 0.6
+
+    def __init__(self, catalog_titles):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True)
+        # rows are L2-normalised, so the sparse dot product is the cosine similarity
+        self.matrix = self.vectorizer.fit_transform(catalog_titles)
+
+    def similarity(self, queries):
+        return (self.vectorizer.transform(queries) @ self.matrix.T).toarray()
+
+
+BACKENDS = {
+    "transformer": TransformerBackend,
+    "tfidf": TfidfBackend,
+}
+
+
+def make_backend(catalog_titles, name=None):
+    name = name or MATCHER_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown matcher backend: {name}")
+    return BACKENDS[name](catalog_titles)
@@ -1,9 +1,31 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 2
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Daily Collection",
+        "EMPIRE INTERNATIONAL",
+        "Screen Total",
+        "Amt.(inc.VAT)",
+        "Net Amount"
+    ],
+    stop=["Distributor Total"],
+    patterns={
+        "day_header": r"\b\d{1,2}\s+[A-Za-z]+\s+\d{4}\s*,\s*[A-Za-z]+\b",  # eg 15 January 2026 , Thursday
+        "movie_total": r"Movie Total",
+        "time": r"\b\d{1,2}:\d{2}\s?(?i:am|pm)\b",
+        "date": r"\b\d{2}/\d{2}/\d{4}\b",
+    },
+)
+
 
 
 # -------------------------------
@@ -28,34 +50,43 @@ def clean_num(x):
 
 #extrac the comps only and injetc them later on in any of the itmings
 
-def extract_comps_array(pdf_path):
+def extract_page_comps(page):
     comps_array = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables()
+    tables = page.extract_tables()
 
-            for table in tables:
-                for row in table:
-                    # normalize row
-                    if not row:
-                        continue
+    for table in tables:
+        for row in table:
+            # normalize row
+            if not row:
+                continue
 
-                    # screen summary row:
-                    # first two columns are None
-                    if row[0] is None and row[1] is None:
-                        comp_value = row[3]
+            # screen summary row:
+            # first two columns are None
+            if row[0] is None and row[1] is None:
+                comp_value = row[3]
 
-                        if comp_value and str(comp_value).strip().isdigit():
-                            comps_array.append(int(comp_value))
-                        else:
-                            comps_array.append(0)
+                if comp_value and str(comp_value).strip().isdigit():
+                    comps_array.append(int(comp_value))
+                else:
+                    comps_array.append(0)
 
-                        break  # only first summary row per table
+                break  # only first summary row per table
 
     return comps_array
 
 
+def comp_at(comps_arr, pages, index):
+    # tables are read page by page, only as far as the screen being parsed:
+    # pages after "Distributor Total" are never analysed
+    while index >= len(comps_arr):
+        page = next(pages, None)
+        if page is None:
+            return 0
+        comps_arr.extend(extract_page_comps(page))
+    return comps_arr[index]
+
+
 
 
 
@@ -69,11 +100,10 @@ def extract_comps_array(pdf_path):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -89,161 +119,150 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path):
+def extract_page2_details(doc):
 
     page2_rows = []
-    comps_arr = extract_comps_array(pdf_path)
+    comps_arr = []
+    comp_pages = iter(doc.pages)
     new_screen=True
     new_screen_line=0
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-
-        current_movie = ""
-        current_screen = ""
-        current_time = ""
-        current_date=""
-        current_format = "2D"
-        ticket_class=""
-        its_movie = True
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+    current_movie = ""
+    current_screen = ""
+    current_time = ""
+    current_date=""
+    current_format = "2D"
+    ticket_class=""
+    its_movie = True
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[1:] #remove first 1 lines
+    # Loop from page 1 until last page
+    for text in doc.texts():
 
-            for line in lines:
+        lines = text.splitlines()
+        lines = lines[1:] #remove first 1 lines
 
-                stripped = line.strip()
+        for line in lines:
 
+            stripped = line.strip()
 
-                skip_phrases = [
-                    "Daily Collection",
-                    "EMPIRE INTERNATIONAL",
-                    "Screen Total",
-                    "Amt.(inc.VAT)",
-                    "Net Amount"
+            m = line_classes.scan(stripped)
 
-                ]
+            # break if Distributor Total
+            if m["stop"]:
+                #print("Distributor Total")
+                doc.stop_pages()
+                break
 
+            if m["skip"]:
+                #print("skip")
+                continue
+            
+            if m["day_header"]:  #skip if has date format: eg 15 January 2026 , Thursday
+                continue
 
-                # break if Distributor Total
-                if "Distributor Total" in stripped:
-                    #print("Distributor Total")
-                    break
 
-                if any(p in stripped for p in skip_phrases):
-                    #print("skip")
-                    continue
-                
-                if re.search(r"\b\d{1,2}\s+[A-Za-z]+\s+\d{4}\s*,\s*[A-Za-z]+\b", line):  #skip if has date format: eg 15 January 2026 , Thursday
-                    continue
+            #detect Movie
+            # detect Movie (first valid line only)
+            if its_movie:
+                current_movie = stripped
+                #print("current_movie:",current_movie)
+                its_movie = False
+                continue
 
 
-                #detect Movie
-                # detect Movie (first valid line only)
-                if its_movie:
-                    current_movie = stripped
-                    #print("current_movie:",current_movie)
-                    its_movie = False
-                    continue
+            if m["movie_total"]:
+                its_movie = True
+                #print("new movie will commence")
+                continue
 
+            if m["time"]:
+                # extract date dd/mm/yyyy
+                current_date = m["date"] or ""
 
-                if "Movie Total" in stripped:
-                    its_movie = True
-                    #print("new movie will commence")
-                    continue
 
-                if re.search(r"\b\d{1,2}:\d{2}\s?(am|pm)\b", stripped, re.IGNORECASE):
-                    # extract date dd/mm/yyyy
-                    date_match = re.search(r"\b\d{2}/\d{2}/\d{4}\b", stripped)
-                    current_date = date_match.group() if date_match else ""
 
+                # extract time
+                current_time = m["time"]
+                #print(current_date,current_time)
 
 
-                    # extract time
-                    time_match = re.search(r"\b\d{1,2}:\d{2}\s?(am|pm)\b", stripped, re.IGNORECASE)
-                    current_time = time_match.group() if time_match else ""
-                    #print(current_date,current_time)
+                parts = stripped.split()
 
+                # defaults
+                admits = 0
+                net = 0
+                gross = 0
+                
+                #attach the cmops to teh first time
+                if new_screen==True:
+                  comps = comp_at(comps_arr, comp_pages, new_screen_line)
+                  new_screen_line=new_screen_line+1
+                  new_screen=False
+                else:
+                  comps = 0
+                
+                
 
-                    parts = stripped.split()
-
-                    # defaults
+                if len(parts) == 3:  #show without admissions
+                    #print("Show iwhtout addmission")
                     admits = 0
-                    net = 0
                     gross = 0
-                    
-                    #attach the cmops to teh first time
-                    if new_screen==True:
-                      comps = comps_arr[new_screen_line] if new_screen_line < len(comps_arr) else 0
-                      new_screen_line=new_screen_line+1
-                      new_screen=False
-                    else:
-                      comps = 0
-                    
-                    
-
-                    if len(parts) == 3:  #show without admissions
-                        #print("Show iwhtout addmission")
-                        admits = 0
-                        gross = 0
-                        net = 0
+                    net = 0
 
-                    else:
+                else:
 
-                        # CASE 1: pure comps (exactly 5 parts, last 2 equal digits)
-                        if (
-                            len(parts) == 5
-                            and parts[-1].isdigit()
-                            and parts[-2].isdigit()
-                            and parts[-1] == parts[-2]
-                        ):
-                            admits = clean_num(parts[-1]) # it will be eliminatted later on
-                            gross = 0
-                            net=0
-                            #do not consider comps are they are beign considered in the total
+                    # CASE 1: pure comps (exactly 5 parts, last 2 equal digits)
+                    if (
+                        len(parts) == 5
+                        and parts[-1].isdigit()
+                        and parts[-2].isdigit()
+                        and parts[-1] == parts[-2]
+                    ):
+                        admits = clean_num(parts[-1]) # it will be eliminatted later on
+                        gross = 0
+                        net=0
+                        #do not consider comps are they are beign considered in the total
 
-                        # CASE 2: normal admits calculation
-                        elif len(parts) >= 5 and parts[3].isdigit():
-                            #print("normal row")
-                            net=clean_num(parts[-1])
-                            gross=clean_num(parts[-4])
+                    # CASE 2: normal admits calculation
+                    elif len(parts) >= 5 and parts[3].isdigit():
+                        #print("normal row")
+                        net=clean_num(parts[-1])
+                        gross=clean_num(parts[-4])
 
 
-                            admits = clean_num(int(parts[3]))
+                        admits = clean_num(int(parts[3]))
 
 
-                else:
-                    current_screen = stripped
-                    new_screen=True
-                    #print("current_screen",current_screen)
-                    continue
+            else:
+                current_screen = stripped
+                new_screen=True
+                #print("current_screen",current_screen)
+                continue
 
 
-                admits = admits - comps if comps is not None else admits
+            admits = admits - comps if comps is not None else admits
 
-                #print("rows added")
+            #print("rows added")
 
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    ticket_class,
-                    admits,
-                    gross,
-                    net,
-                    comps,
-                    None,
-                    None
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                ticket_class,
+                admits,
+                gross,
+                net,
+                comps,
+                None,
+                None
 
 
-                ])
+            ])
 
 
     return page2_rows
@@ -259,15 +278,15 @@ def fetch_data(pdf_path,exhibitor):
 
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-
-
-    # -------- PAGE 1 ----------
-    cinema_name = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
 
+        # -------- PAGE 1 ----------
+        cinema_name = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc)
     print(page2_data)
 
     for idx, r in enumerate(page2_data, start=1):
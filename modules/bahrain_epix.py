@@ -1,9 +1,29 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 1
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Generated On",
+        "Final Total",
+        "Show Time Admits",
+        "Total Box Office",
+        "Session Admits"
+    ],
+    patterns={
+        "movie": r"Movie:\s*(?P<title>.*?)\s*No\. of Shows:",
+        "time": r"(?i:\b(0?[1-9]|1[0-2]):[0-5][0-9]\s?(am|pm)\b)",
+    },
+)
+
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
 
 
 # -------------------------------
@@ -51,11 +71,10 @@ def is_number(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -66,7 +85,7 @@ def extract_first_page(pdf_path):
     # extract dates
     line = lines[3]
 
-    found = re.findall(r"\d{4}-\d{2}-\d{2}", line)
+    found = ISO_DATE_RE.findall(line)
 
     if len(found) == 2:
         start = datetime.strptime(found[0], "%d-%m-%Y")
@@ -84,122 +103,109 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path):
+def extract_page2_details(doc):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
 
-        current_movie = ""
-        current_time = ""
-        current_date=""
-        current_format = "2D"
-        ticket_class=""
+    current_movie = ""
+    current_time = ""
+    current_date=""
+    current_format = "2D"
+    ticket_class=""
+
+    screen_type = None
+
+    start=False
+
+    # Loop from page 1 until last page
+    for text in doc.texts():
+
+        lines = text.splitlines()
+        lines = lines[4:] #remove first 4 lines
+        
+        
+        for line in lines:
+            admits = None
+            gross = None
+            net = None
 
-        screen_type = None
+            stripped = line.strip()
+            m = line_classes.scan(stripped)
+              #get movie name
 
-        start=False
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+            if "Movie:" in stripped:
+                if m["movie"] is not None:
+                    current_movie = m["title"]
+
+                    for f in formats:
+                        if f in current_movie:
+                            current_movie = current_movie.replace(f, "").strip(" -")
+                            current_format = "DOLBY"
+                            break
+
+                    start = True
+                    continue
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[4:] #remove first 4 lines
             
+            if start==True:   # skip the summary table
+
+                if m["skip"]:
+                      continue         
+
+                parts = stripped.split()
+                if len(parts) > 0 and is_date(parts[0]):
+                    print("parts[0]",parts[0])
+                    current_date = parts[0]
+                   
+                    gross = clean_num(parts[-3])
+                    net = clean_num(parts[-2])
+                    if m["time"]:
+                        current_time = m["time"].lower()
+                        start_idx = m.start("time")   # index of the time in the string
+                        screen_type = stripped[len(parts[0]):start_idx].strip()
+                        # remove date
+                        remaining = parts[1:]
+
+                        # remove screen words
+                        screen_words = screen_type.split()
+                        remaining = remaining[len(screen_words):]
+
+                        # remove time (HH:MM am/pm)
+                        remaining = remaining[2:]
+
+                        # remove last 3 parts
+                        remaining = remaining[:-3]
+
+
+                        # assign values
+                        admits = clean_num(remaining[0]) if remaining else None
+                        ticket_class = " ".join(remaining[1:]) if len(remaining) > 1 else None
+                  
+                else:
+                    continue
             
-            for line in lines:
-                admits = None
-                gross = None
-                net = None
-
-                stripped = line.strip()
-                  #get movie name
-
-
-                if "Movie:" in stripped:
-                    match = re.search(r"Movie:\s*(.*?)\s*No\. of Shows:", stripped)
-                    if match:
-                        current_movie = match.group(1)
-
-                        for f in formats:
-                            if f in current_movie:
-                                current_movie = current_movie.replace(f, "").strip(" -")
-                                current_format = "DOLBY"
-                                break
-
-                        start = True
-                        continue
-
-                
-                if start==True:   # skip the summary table
-
-                    skip_phrases = [
-                        "Generated On",
-                        "Final Total",
-                        "Show Time Admits",
-                        "Total Box Office",
-                        "Session Admits"
-                    ]
-
-
-
-                    if any(p in stripped for p in skip_phrases):
-                          continue         
-
-                    parts = stripped.split()
-                    if len(parts) > 0 and is_date(parts[0]):
-                        print("parts[0]",parts[0])
-                        current_date = parts[0]
-                       
-                        gross = clean_num(parts[-3])
-                        net = clean_num(parts[-2])
-                        time_match = re.search(r"\b(0?[1-9]|1[0-2]):[0-5][0-9]\s?(am|pm)\b", stripped, re.IGNORECASE)
-                        if time_match:
-                            current_time = time_match.group(0).lower()
-                            start_idx = time_match.start()   # index of the time in the string
-                            screen_type = stripped[len(parts[0]):start_idx].strip()
-                            # remove date
-                            remaining = parts[1:]
-
-                            # remove screen words
-                            screen_words = screen_type.split()
-                            remaining = remaining[len(screen_words):]
-
-                            # remove time (HH:MM am/pm)
-                            remaining = remaining[2:]
-
-                            # remove last 3 parts
-                            remaining = remaining[:-3]
-
-
-                            # assign values
-                            admits = clean_num(remaining[0]) if remaining else None
-                            ticket_class = " ".join(remaining[1:]) if len(remaining) > 1 else None
-                      
-                    else:
-                        continue
-                
-                        
-
-
-                    # Append ticket row
-                    page2_rows.append([
-                        current_movie,
-                        current_date,
-                        current_time,
-                        screen_type,
-                        current_format,
-                        ticket_class,
-                        admits,
-                        gross,
-                        net,
-                        None,
-                        None,
-                        None
-
-
-                    ])
+                    
+
+
+                # Append ticket row
+                page2_rows.append([
+                    current_movie,
+                    current_date,
+                    current_time,
+                    screen_type,
+                    current_format,
+                    ticket_class,
+                    admits,
+                    gross,
+                    net,
+                    None,
+                    None,
+                    None
+
+
+                ])
 
     return page2_rows
 
@@ -214,15 +220,15 @@ def fetch_data(pdf_path,exhibitor):
 
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-
-
-    # -------- PAGE 1 ----------
-    cinema_name, weekly = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
 
+        # -------- PAGE 1 ----------
+        cinema_name, weekly = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc)
     print(page2_data)
 
     for idx, r in enumerate(page2_data, start=1):
@@ -0,0 +1,327 @@
+import hashlib
+import multiprocessing
+import pdfplumber
+from contextlib import contextmanager
+
+from .text_backends import open_backend, check_indexes, CHECK_PAGES
+
+
+def content_key(path):
+    """
+    SHA-256 of the file content plus the pdfplumber version: the same report uploaded
+    again under another temp name gets the same key, a pdfplumber upgrade a new one.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{digest.hexdigest()}-pdfplumber{pdfplumber.__version__}"
+
+
+def _extract_page_range(path, indexes):
+    # one task of ParsedDocument.extract_pages, in a pool process
+    with pdfplumber.open(path) as pdf:
+        return [(index, pdf.pages[index].extract_text() or "") for index in indexes]
+
+
+# -------------------------------
+# PARSED DOCUMENT
+# One uploaded file, shared by the router (get_first_line) and the exhibitor module.
+# The PDF is opened at most once and extract_text() of every page is cached.
+# With a page text cache (page_cache.PageTextCache) a report seen before is served from
+# disk and the PDF is not opened at all, unless a module needs the raw pages.
+# use_text_backend() moves the remaining pages to a faster extractor, checked first. Its
+# pages are cached apart from pdfplumber's, under the content key and the backend name.
+# -------------------------------
+class ParsedDocument:
+
+    def __init__(self, path, cache=None):
+        self.path = path
+        self.cache = cache
+        self._pdf = None
+        self._text = {}
+        self.layout_passes = 0     # extract_text() calls made, at most one per page
+
+        self._content_key = None
+        self._cache_loaded = False
+        self._cached_text = {}     # pages loaded from the cache, not served yet
+        self._page_count = None
+        self._new_text = {}        # pages extracted here, written to the cache on close
+        self._header_text = None   # page 0 cropped to the routing header, kept out of the caches
+        self.stopped = False       # set by stop_pages(): texts() yields no further page
+        self._replayed_stop = None # (pages read, pages skipped) of a parse served from the result cache
+        self.header_passes = 0
+
+        self._backend_pending = None    # set by use_text_backend(), checked on first use
+        self._backend = None
+        self._check_pages = 0
+        self._backend_cached = {}       # fast-backend pages loaded from the cache, not served yet
+        self._backend_new_text = {}     # fast-backend pages extracted here
+        self._backend_pages = set()     # pages whose text came from the fast backend
+        self.backend_rejected = False   # set when a page's fast text was unusable mid-parse
+        self.text_backend = "pdfplumber"
+        self.text_backend_key = "pdfplumber"    # backend asked for and its check, for the result cache
+        self.backend_passes = 0         # pages extracted by the fast backend
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.path)
+        return self._pdf
+
+    @property
+    def pages(self):
+        # raw pdfplumber pages, for tables and crops. Text goes through page_text()
+        return self.pdf.pages
+
+    @property
+    def content_key(self):
+        # hashed once per file, shared by the page text and parsed result caches
+        if self._content_key is None:
+            self._content_key = content_key(self.path)
+        return self._content_key
+
+    def _load_cache(self):
+        if self.cache is None or self._cache_loaded:
+            return
+        self._cache_loaded = True
+        self._page_count, self._cached_text = self.cache.load(self.content_key)
+
+    @property
+    def page_count(self):
+        self._load_cache()
+        if self._page_count is None:
+            self._page_count = len(self.pdf.pages)
+        return self._page_count
+
+    def page_text(self, index):
+        if index not in self._text:
+            self._load_cache()
+            if index in self._cached_text:
+                self._text[index] = self._cached_text.pop(index)
+                if self.cache is not None:
+                    self.cache.stats["hits"] += 1
+            else:
+                backend = self._fast_backend()
+                # the backend check may have extracted this page already
+                if index not in self._text:
+                    if index in self._backend_cached:
+                        # only loaded with a cache, once the backend passed its check
+                        self._text[index] = self._backend_cached.pop(index)
+                        self._backend_pages.add(index)
+                        self.cache.stats["hits"] += 1
+                    else:
+                        text = None
+                        if backend is not None:
+                            try:
+                                text = backend.page_text(index)
+                            except Exception as e:
+                                self._reject_backend(e)
+                        if text is not None:
+                            self._text[index] = text
+                            self.backend_passes += 1
+                            self._backend_new_text[index] = text
+                            self._backend_pages.add(index)
+                        else:
+                            self._text[index] = self.pdf.pages[index].extract_text() or ""
+                            self.layout_passes += 1
+                            self._new_text[index] = self._text[index]
+                        if self.cache is not None:
+                            self.cache.stats["misses"] += 1
+        return self._text[index]
+
+    def use_text_backend(self, name, check_pages=CHECK_PAGES):
+        """
+        Pages not known yet are extracted by a faster backend (modules.text_backends)
+        instead of pdfplumber. On the first such page check_pages pages spread over the
+        file (check_indexes) are extracted by both: if any differs, the file stays on
+        pdfplumber. A later page the backend cannot read, or reads inconsistently, sets
+        backend_rejected: the caller parses the file again, from pdfplumber only.
+        """
+        if name != "pdfplumber":
+            self._backend_pending = name
+            self._check_pages = check_pages
+            self.text_backend_key = f"{name}-check{check_pages}"
+
+    def _fast_backend(self):
+        if self._backend_pending is None:
+            return self._backend
+
+        name, self._backend_pending = self._backend_pending, None
+        backend = None
+        try:
+            backend = open_backend(name, self.path)
+            if backend.page_count != self.page_count:
+                print(f"{name} finds {backend.page_count} pages, pdfplumber {self.page_count}, "
+                      f"using pdfplumber:", self.path)
+                backend.close()
+                return None
+            for index in check_indexes(self.page_count, self._check_pages):
+                if backend.page_text(index) != self.page_text(index):
+                    print(f"{name} text differs from pdfplumber on page {index + 1}, "
+                          f"using pdfplumber:", self.path)
+                    backend.close()
+                    return None
+        except Exception as e:
+            print(f"{name} text backend failed, using pdfplumber:", self.path, e)
+            if backend is not None:
+                backend.close()
+            return None
+
+        self._backend = backend
+        self.text_backend = name
+        if self.cache is not None:
+            _, self._backend_cached = self.cache.load(self._backend_cache_key)
+        return backend
+
+    def _reject_backend(self, reason):
+        print(f"{self.text_backend} text rejected, using pdfplumber:", self.path, reason)
+        self._backend.close()
+        self._backend = None
+        self.text_backend = "pdfplumber"
+        for index in self._backend_pages:
+            self._text.pop(index, None)
+        self._backend_pages = set()
+        self._backend_cached = {}
+        self._backend_new_text = {}
+        self.backend_rejected = True
+
+    @property
+    def _backend_cache_key(self):
+        return f"{self.content_key}-{self.text_backend}"
+
+    def header_text(self, bbox):
+        """
+        Text of the top of page 0, for routing. bbox is (x0, top, x1, bottom) as fractions
+        of the page. Page 0's full text is returned instead when it is already known.
+        """
+        self._load_cache()
+        if 0 in self._text or 0 in self._cached_text:
+            return self.page_text(0)
+
+        if self._header_text is None:
+            page = self.pdf.pages[0]
+            px0, ptop, px1, pbottom = page.bbox
+            width, height = px1 - px0, pbottom - ptop
+            x0, top, x1, bottom = bbox
+            crop = page.crop((
+                px0 + x0 * width, ptop + top * height,
+                px0 + x1 * width, ptop + bottom * height,
+            ))
+            self._header_text = crop.extract_text() or ""
+            self.header_passes += 1
+        return self._header_text
+
+    def extract_pages(self, workers, timeout=None):
+        """
+        Phase 1 of a two-phase parse: extract_text() of every page not known yet, run in
+        `workers` processes over page ranges. The parser then reads the text in order,
+        as usual. Returns the number of pages extracted, 0 when nothing was run: a daemon
+        process cannot start the pool. On timeout or an error the pool
+        is killed and the pages are left to the parser.
+        """
+        # a fast text backend passing its check extracts the pages itself
+        if self._fast_backend() is not None:
+            return 0
+        self._load_cache()
+        missing = [i for i in range(self.page_count) if i not in self._text and i not in self._cached_text]
+        if workers < 2 or len(missing) < 2 or multiprocessing.current_process().daemon:
+            return 0
+
+        # a few ranges per process, so a slow range does not leave the others idle
+        size = max(4, -(-len(missing) // (workers * 4)))
+        ranges = [missing[k:k + size] for k in range(0, len(missing), size)]
+
+        pool = multiprocessing.get_context("spawn").Pool(min(workers, len(ranges)))
+        try:
+            results = pool.starmap_async(_extract_page_range, [(self.path, r) for r in ranges]).get(timeout)
+        except Exception:
+            # over the timeout, or a page failing: the parser extracts the pages itself
+            return 0
+        finally:
+            pool.terminate()
+            pool.join()
+
+        for chunk in results:
+            for index, text in chunk:
+                self._text[index] = text
+                self._new_text[index] = text
+        self.layout_passes += len(missing)
+        if self.cache is not None:
+            self.cache.stats["misses"] += len(missing)
+        return len(missing)
+
+    def page_lines(self, index):
+        return self.page_text(index).splitlines()
+
+    @property
+    def pages_read(self):
+        if self._replayed_stop is not None:
+            return self._replayed_stop[0]
+        return sorted(self._text)
+
+    def texts(self, start=0):
+        # pages are extracted one at a time, as the caller reaches them
+        for index in range(start, self.page_count):
+            if self.stopped:
+                return
+            yield self.page_text(index)
+
+    def stop_pages(self):
+        """
+        Called by a parser on its end-of-data line (a distributor total, a summary
+        section): the pages after the current one are never extracted.
+        """
+        self.stopped = True
+
+    def replay_stop(self, pages_read, pages_skipped):
+        """
+        The end of data of the parse a cached result came from: pages_read and
+        pages_skipped report it as if the parser had run.
+        """
+        self.stopped = True
+        self._replayed_stop = (list(pages_read), pages_skipped)
+
+    @property
+    def pages_skipped(self):
+        if self._replayed_stop is not None:
+            return self._replayed_stop[1]
+        return self.page_count - len(self._text)
+
+    def close(self):
+        if self.cache is not None and self._new_text:
+            self.cache.store(self.content_key, self._page_count, self._new_text)
+            self._new_text = {}
+        if self.cache is not None and self._backend_new_text:
+            self.cache.store(self._backend_cache_key, self._page_count, self._backend_new_text)
+            self._backend_new_text = {}
+
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def open_document(source, cache=None):
+    """
+    Accepts a file path or a ParsedDocument. A document opened here is closed on exit,
+    one passed in is left open for its owner.
+    """
+    if isinstance(source, ParsedDocument):
+        yield source
+        return
+
+    doc = ParsedDocument(source, cache)
+    try:
+        yield doc
+    finally:
+        doc.close()
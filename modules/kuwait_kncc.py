@@ -1,9 +1,55 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 2
+
+
+skip_phrases = [
+    "Head Office",
+    "Business Date",
+    "Gross Box Office",
+    "Number Admits",
+    "Distributor Daily Box Office",
+    "HOReportFiles",
+    "Vista Entertainment Solutions Ltd",
+    "Cinescape Total"
+]
+
+# skipped when the whole line is one of these
+is_phrases = {
+    "Head Office",
+    "Distributor Daily Box Office",
+    "Empire",
+    "Cinescape",
+    "Cinescape Total",
+    "Total"
+}
+
+
+def line_classifier(cinema_map):
+    """
+    The body lines of a report: the "<cinema> TOTAL" lines come from the cinema map,
+    so this is built per file, once.
+    """
+    cinema_totals = {f"{v} TOTAL" for v in cinema_map.keys()}
+    return LineClassifier(
+        skip=skip_phrases,
+        patterns={
+            "summary": r"^Film Summary$",
+            "is_phrase": "^(?:" + "|".join(re.escape(p) for p in sorted(is_phrases)) + ")$",
+            # (?!) never matches: no cinemas, no total lines
+            "cinema_total": "(?i:" + ("|".join(re.escape(ct.upper()) for ct in sorted(cinema_totals)) or "(?!)") + ")",
+        },
+    )
+
+
+KD_AMOUNT_RE = re.compile(r"^KD\d{1,3}(?:,\d{3})*(?:\.\d+)?$")
+
 
 
 # -------------------------------
@@ -40,11 +86,10 @@ def clean_num(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -60,128 +105,105 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path,cinema_map,extract_date,current_date):
+def extract_page2_details(doc,cinema_map,extract_date,current_date):
 
     page2_rows = []
-    cinema_totals = {f"{v} TOTAL" for v in cinema_map.keys()}
+    line_classes = line_classifier(cinema_map)
 
 
-    with pdfplumber.open(pdf_path) as pdf:
 
-        current_cinema=""
-        current_movie = ""
-        current_time = ""
-        current_format = "2D"
-        comps=""
-        formats=[]
+    current_cinema=""
+    current_movie = ""
+    current_time = ""
+    current_format = "2D"
+    comps=""
+    formats=[]
 
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+    # Loop from page 1 until last page
+    for text in doc.texts():
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[1:] #remove first 1 line
+        lines = text.splitlines()
+        lines = lines[1:] #remove first 1 line
 
 
-            for line in lines:
+        for line in lines:
 
-                stripped = line.strip()
-                
-                #break is  reached summary line
-                if stripped == "Film Summary":
-                  break
+            stripped = line.strip()
+            m = line_classes.scan(stripped)
+            
+            #break is  reached summary line
+            if m["summary"]:
+              doc.stop_pages()
+              break
 
-                is_phrases =[
-                    "Head Office",
-                    "Distributor Daily Box Office",
-                    "Empire",
-                    "Cinescape",
-                    "Cinescape Total",
-                    "Total"
+            if m["skip"]:
+                continue
 
-                ]
+            if m["is_phrase"]:
+                continue
+            if m["cinema_total"]:
+                continue
 
-                has_word = [
-                    "Head Office",
-                    "Business Date",
-                    "Gross Box Office",
-                   "Number Admits",
-                    "Distributor Daily Box Office",
-                    "HOReportFiles",
-                    "Vista Entertainment Solutions Ltd",
-                    "Cinescape Total"
 
-                ]
 
+            #detect cinema
+            key = stripped.strip()
+            if key.upper() in cinema_map:
+              current_cinema = key
+              continue
 
-                if any(p in stripped for p in has_word):
-                    continue
-
-                if stripped in is_phrases:
-                    continue
-                if any(ct.upper() in stripped.upper() for ct in cinema_totals):
-                    continue
-
-
-
-                #detect cinema
-                key = stripped.strip()
-                if key.upper() in cinema_map:
-                  current_cinema = key
+            #Detect movie name and format
+            parts = stripped.split()
+            if parts and parts[-1].isdigit():  # skip if format i there but empty admits
+              continue
+            if len(parts) >= 4 and KD_AMOUNT_RE.match(parts[-1]):
+                if parts[0]=="Total":
                   continue
+                # extract values
+                gross = float(parts[-1].replace("KD", "").replace(",", ""))
+                comps = clean_num(parts[-3])
+                admits = clean_num(parts[-4])
 
-                #Detect movie name and format
-                parts = stripped.split()
-                if parts and parts[-1].isdigit():  # skip if format i there but empty admits
-                  continue
-                if len(parts) >= 4 and re.match(r"^KD\d{1,3}(?:,\d{3})*(?:\.\d+)?$", parts[-1]):
-                    if parts[0]=="Total":
-                      continue
-                    # extract values
-                    gross = float(parts[-1].replace("KD", "").replace(",", ""))
-                    comps = clean_num(parts[-3])
-                    admits = clean_num(parts[-4])
-
-                    # everything before that is format
-                    current_format = " ".join(parts[:-5]).strip()
-                    formats.append(current_format)
-          
+                # everything before that is format
+                current_format = " ".join(parts[:-5]).strip()
+                formats.append(current_format)
+      
 
-                else:
-                    # no KD amount → treat whole line as movie name
-                    current_movie = stripped
-                    nbr_screens = 1
-                    formats=[]
-                    continue
+            else:
+                # no KD amount → treat whole line as movie name
+                current_movie = stripped
+                nbr_screens = 1
+                formats=[]
+                continue
 
-                net    = None
+            net    = None
 
 
 
 
 
-                # Append ticket row
-                page2_rows.append([
+            # Append ticket row
+            page2_rows.append([
 
-                    current_cinema,
-                    None,
-                    extract_date,
-                    current_movie,
-                    current_date,
-                    None,
-                    None,
-                    current_format,
-                    None,
-                    admits,
-                    gross,
-                    net,
-                    comps,
-                    None,
-                    None
+                current_cinema,
+                None,
+                extract_date,
+                current_movie,
+                current_date,
+                None,
+                None,
+                current_format,
+                None,
+                admits,
+                gross,
+                net,
+                comps,
+                None,
+                None
 
 
-                ])
+            ])
 
     return page2_rows
 
@@ -196,18 +218,18 @@ def fetch_data(pdf_path,exhibitor,cinema_map):
 
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-    #week_type = get_week_type(f)
-
-    # -------- PAGE 1 ----------
-    date_value = extract_first_page(pdf_path)
-
-    extract_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
+        #week_type = get_week_type(f)
 
+        # -------- PAGE 1 ----------
+        date_value = extract_first_page(doc)
 
+        extract_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path,cinema_map,extract_date,date_value)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc,cinema_map,extract_date,date_value)
     print(page2_data)
 
 
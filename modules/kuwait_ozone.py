@@ -1,13 +1,16 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+PARSER_VERSION = 1
+
 
 
 def fetch_data(pdf_path,exhibitor):
 
+  # the router passes its ParsedDocument, the workbook itself is read with pandas
+  pdf_path = getattr(pdf_path, "path", pdf_path)
   df_raw = pd.read_excel(pdf_path, engine="openpyxl", header=None)
 
   # metadata (same as you had)
@@ -1,9 +1,27 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier, SKIP
+
+PARSER_VERSION = 1
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Distributors by Film and Ticket Type",
+        "Vista Entertainment Solutions Ltd",
+        "REPORT DATE RANGE",
+        "Empire Film Distribution",
+        "GROSS TOTAL",
+        "Empire Film Distribution total"
+    ],
+)
+
+REPORT_DATE_RE = re.compile(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}")
+AMOUNT_RE = re.compile(r"^[\d,]+(\.\d+)?$")
 
 
 # -------------------------------
@@ -43,11 +61,10 @@ def clean_num(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
     week_type=""
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -64,7 +81,7 @@ def extract_first_page(pdf_path):
     # -------------------------------
     date_value = ""
 
-    m = re.search(r"\d{1,2}\s+[A-Za-z]+\s+\d{4}", lines[2])
+    m = REPORT_DATE_RE.search(lines[2])
     if m:
         date_value = datetime.strptime(
             m.group(), "%d %B %Y"
@@ -81,76 +98,63 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path,current_date):
+def extract_page2_details(doc,current_date):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
 
-        current_movie = ""
-        current_screen = ""
-        current_time = ""
-        current_format = "2D"
-        ticket_class=""
+    current_movie = ""
+    current_screen = ""
+    current_time = ""
+    current_format = "2D"
+    ticket_class=""
 
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+    # Loop from page 1 until last page
+    for text in doc.texts():
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[5:] #remove first 5 lines
+        lines = text.splitlines()
+        lines = lines[5:] #remove first 5 lines
 
 
-            for line in lines:
+        for line in lines:
 
-                stripped = line.strip()
+            stripped = line.strip()
 
+            if line_classes.classify(stripped) == SKIP:
+                continue
 
-                skip_phrases = [
-                    "Distributors by Film and Ticket Type",
-                    "Vista Entertainment Solutions Ltd",
-                    "REPORT DATE RANGE",
-                    "Empire Film Distribution",
-                    "GROSS TOTAL",
-                    "Empire Film Distribution total"
-                ]
+            parts = stripped.split()
 
+            if len(parts) >= 6 and AMOUNT_RE.match(parts[-1]):
+              gross = clean_num(parts[-1])
+              net = clean_num(parts[-3])
+              admits = clean_num(parts[-4])
+              current_movie = " ".join(parts[:-6])
 
-                if any(p in stripped for p in skip_phrases):
-                    continue
+            else:
+              continue
 
-                parts = stripped.split()
 
-                if len(parts) >= 6 and re.match(r"^[\d,]+(\.\d+)?$", parts[-1]):
-                  gross = clean_num(parts[-1])
-                  net = clean_num(parts[-3])
-                  admits = clean_num(parts[-4])
-                  current_movie = " ".join(parts[:-6])
 
-                else:
-                  continue
 
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                ticket_class,
+                admits,
+                gross,
+                net,
+                0,  #"in case price is 0 the put admists in comps and put admits=0
+                None,
+                None
 
 
-
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    ticket_class,
-                    admits,
-                    gross,
-                    net,
-                    0,  #"in case price is 0 the put admists in comps and put admits=0
-                    None,
-                    None
-
-
-                ])
+            ])
 
     return page2_rows
 
@@ -165,15 +169,16 @@ def fetch_data(pdf_path,exhibitor):
     rows_page1 = []
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-    #week_type = get_week_type(f)
-
-    # -------- PAGE 1 ----------
-    cinema_name, date_value,week_type = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
+        #week_type = get_week_type(f)
 
+        # -------- PAGE 1 ----------
+        cinema_name, date_value,week_type = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path,date_value)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc,date_value)
 
     for idx, r in enumerate(page2_data, start=1):
       new_row = [
@@ -1,9 +1,39 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 1
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Distributors Report by Film",
+        "Ticket Type",
+        "C:\VISTA\ReportFiles",
+        "Total for Film this Screen",
+        "Day Total",
+        "Movie Format",
+        "Split Movie Format",
+        "Ticket Detail Level",
+        "Detailed Distributors Report",
+        "Vista Entertainment Solutions",
+        "Empire(",
+        "Avg Ticket Price",
+        "EMPIRE ENTERTAINMENT",
+        "Ticket Prices Admits",
+    ],
+    patterns={
+        "film_format": r"(?i:Film\s*:\s*(?P<film>[A-Z0-9 ()\-:'&]+?)\s*Format\s*:\s*(?P<format>[A-Z0-9]+))",
+    },
+)
+
+HEADER_DATE_RE = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}")
+WEEKDAY_RE = re.compile(r"\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday|After Midnight)\b", re.IGNORECASE)
+SHOW_DATE_RE = re.compile(r"\b(\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)-\d{2,4})\b", re.IGNORECASE)
 
 
 #FORMATS
@@ -51,11 +81,10 @@ def clean_num(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
     week_type=""
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -70,7 +99,7 @@ def extract_first_page(pdf_path):
     date_pattern = re.compile(r"\b\d{2}/\d{2}/\d{2,4}\b")
 
 
-    dates = re.findall(r"\d{1,2}/\d{1,2}/\d{2,4}", "\n".join(lines[:10]))
+    dates = HEADER_DATE_RE.findall("\n".join(lines[:10]))
     date_value = dates[0] if dates else ""
     if len(dates) >= 2:
         d1 = datetime.strptime(dates[0], "%d/%m/%Y")
@@ -87,148 +116,122 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path):
+def extract_page2_details(doc):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
 
-        current_movie = ""
-        current_screen = ""
-        current_date = ""
-        current_time = ""
-        current_format = "2D"
+    current_movie = ""
+    current_screen = ""
+    current_date = ""
+    current_time = ""
+    current_format = "2D"
 
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+    # Loop from page 1 until last page
+    for text in doc.texts():
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[1:] #remove first 1 line
+        lines = text.splitlines()
+        lines = lines[1:] #remove first 1 line
 
-            skip=0
-            for line in lines:
- 
-                if skip==1:
-                  if stripped.replace(" ", "").replace(".", "").isdigit():
-                    skip = 0
-                  continue
+        skip=0
+        for line in lines:
 
-                stripped = line.strip()
-                if stripped == "Totals":
-                    skip=1
-                    continue
-                
-
-                skip_phrases = [
-                    "Distributors Report by Film",
-                    "Ticket Type",
-                    "Distributors Report by Film",
-                    "C:\VISTA\ReportFiles",
-                    "Total for Film this Screen",
-                    "Day Total",
-                    "Movie Format",
-                    "Split Movie Format",
-                    "Ticket Detail Level",
-                    "Detailed Distributors Report",
-                    "Vista Entertainment Solutions",
-                    "Empire(",
-                    "Avg Ticket Price",
-                    "EMPIRE ENTERTAINMENT",
-                    "Split Movie Format",
-                    "Ticket Prices Admits",
-                ]
-
-
-                if any(p in stripped for p in skip_phrases):
-                    continue
+            if skip==1:
+              if stripped.replace(" ", "").replace(".", "").isdigit():
+                skip = 0
+              continue
 
-                # Skip purely numeric lines
-                if stripped.replace(" ", "").isdigit():
-                    continue
+            stripped = line.strip()
+            if stripped == "Totals":
+                skip=1
+                continue
+            
 
-                #Detect movie name and format
-                mo = re.search(r"Film\s*:\s*([A-Z0-9 ()\-:'&]+?)\s*Format\s*:\s*([A-Z0-9]+)",stripped,re.IGNORECASE)
+            line_match = line_classes.scan(stripped)
+            if line_match["skip"]:
+                continue
 
-                if mo:
-                    current_movie = mo.group(1).strip()
-                    fmt = mo.group(2).strip().upper()
-                    current_format = "2D" if fmt == "DEFAULT" else fmt
-                    continue
-                
-                #replace Days of week with ""
-                stripped = re.sub(r"\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday|After Midnight)\b", "", stripped, flags=re.IGNORECASE).strip()
-               
-
-                m = re.search(r"\b(\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)-\d{2,4})\b",
-                    stripped,
-                  re.IGNORECASE
-                )
-                if m:
-                    current_date = m.group(0)
-                    continue
+            # Skip purely numeric lines
+            if stripped.replace(" ", "").isdigit():
+                continue
 
-                parts = stripped.split()
+            #Detect movie name and format
+            if line_match["film_format"]:
+                current_movie = line_match["film"].strip()
+                fmt = line_match["format"].strip().upper()
+                current_format = "2D" if fmt == "DEFAULT" else fmt
+                continue
+            
+            #replace Days of week with ""
+            stripped = WEEKDAY_RE.sub("", stripped).strip()
+           
 
+            m = SHOW_DATE_RE.search(stripped)
+            if m:
+                current_date = m.group(0)
+                continue
 
-                # Check if last 5 tokens are numeric fields
-                numeric_tail = parts[-5:]
+            parts = stripped.split()
 
-                # Must contain exactly 5 tokens
-                if len(numeric_tail) != 5:
-                    continue
-                #if all zeros skip
-                if all(t in ["0", "0.0", "0.00"] or t == 0 for t in numeric_tail):
-                    continue
 
+            # Check if last 5 tokens are numeric fields
+            numeric_tail = parts[-5:]
+
+            # Must contain exactly 5 tokens
+            if len(numeric_tail) != 5:
+                continue
+            #if all zeros skip
+            if all(t in ["0", "0.0", "0.00"] or t == 0 for t in numeric_tail):
+                continue
 
-                 #ticket class
-                ticket_class=parts[:-5]
-                ticket_class=" ".join(ticket_class).strip()
 
+             #ticket class
+            ticket_class=parts[:-5]
+            ticket_class=" ".join(ticket_class).strip()
 
-                # Validate each of the 5 numeric fields
-                is_numeric_tail = True
-                for x in numeric_tail:
-                    cleaned = x.replace(",", "")
-                    if cleaned.replace(".", "").isdigit():
-                        continue
-                    is_numeric_tail = False
-                    break
 
-                if not is_numeric_tail:
+            # Validate each of the 5 numeric fields
+            is_numeric_tail = True
+            for x in numeric_tail:
+                cleaned = x.replace(",", "")
+                if cleaned.replace(".", "").isdigit():
                     continue
+                is_numeric_tail = False
+                break
 
-                admits, netprice, net, grossprice, gross = numeric_tail
+            if not is_numeric_tail:
+                continue
 
+            admits, netprice, net, grossprice, gross = numeric_tail
 
 
-                admits = clean_num(admits)
-                gross  = clean_num(gross)
-                net    = clean_num(net)
-                price = clean_num(grossprice)
-               
 
+            admits = clean_num(admits)
+            gross  = clean_num(gross)
+            net    = clean_num(net)
+            price = clean_num(grossprice)
+           
 
 
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    ticket_class,
-                    0 if price == 0 else admits,
-                    gross,
-                    net,
-                    admits if price == 0 else 0,  #"in case price is 0 the put admists in comps and put admits=0
-                    None,
-                    None
 
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                ticket_class,
+                0 if price == 0 else admits,
+                gross,
+                net,
+                admits if price == 0 else 0,  #"in case price is 0 the put admists in comps and put admits=0
+                None,
+                None
 
-                ])
+
+            ])
 
     return page2_rows
 
@@ -243,15 +246,16 @@ def fetch_data(pdf_path,exhibitor):
     rows_page1 = []
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-    #week_type = get_week_type(f)
-
-    # -------- PAGE 1 ----------
-    cinema_name, date_value,week_type = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
+        #week_type = get_week_type(f)
 
+        # -------- PAGE 1 ----------
+        cinema_name, date_value,week_type = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc)
 
     for idx, r in enumerate(page2_data, start=1):
       new_row = [
@@ -0,0 +1,115 @@
+import re
+
+
+# -------------------------------
+# LONGEST PHRASE MATCHING
+# The phrases are merged into a trie and compiled to one regex, so a line is scanned once
+# in the regex engine instead of once per phrase with `phrase in line`.
+# -------------------------------
+def _trie_pattern(node):
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # a phrase ends here: the longer branches are optional, tried first
+    return f"(?:{body})?" if "" in node else body
+
+
+class PhraseMatcher:
+
+    def __init__(self, phrases):
+        trie = {}
+        self._rank = {}
+        for phrase in phrases:
+            if not phrase:
+                continue
+            self._rank.setdefault(phrase, len(self._rank))
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        # lookahead: the longest phrase starting at every position, overlapping ones included
+        self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))") if trie else None
+
+    def longest(self, text):
+        """
+        Longest phrase occurring anywhere in text, the first in the phrase list on a tie.
+        "" if none.
+        """
+        if self._pattern is None:
+            return ""
+        found = self._pattern.findall(text)
+        if not found:
+            return ""
+        return min(found, key=lambda m: (-len(m), self._rank[m]))
+
+
+# -------------------------------
+# LINE CLASSIFIER
+# Everything a parser looks for in a line (skip and stop phrases, date / time / movie...
+# patterns), declared once at module level and compiled at import into one regex: each
+# class is an optional lookahead from the start of the line, so a single match call
+# reports every class the line contains.
+# -------------------------------
+SKIP = "skip"
+STOP = "stop"
+
+
+def _trie_regex(phrases):
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return _trie_pattern(trie) if trie else None
+
+
+def phrases_regex(phrases):
+    """
+    One compiled regex finding any of the phrases, None for no phrases.
+    """
+    pattern = _trie_regex(phrases)
+    return re.compile(pattern) if pattern is not None else None
+
+
+class LineClassifier:
+
+    def __init__(self, skip=(), stop=(), patterns=None, upper=False):
+        """
+        skip / stop: phrases found anywhere in a line. A stop phrase wins over a skip one.
+        patterns: {name: regex} searched anywhere in the line, as re.search would. Flags
+        go inline, e.g. "(?i:...)"; groups of their own are not numbered for the caller.
+        upper: phrases matched case-insensitively, for parsers testing `phrase in ln.upper()`
+        with upper-case phrases.
+        """
+        classes = []
+        for name, phrases in ((STOP, stop), (SKIP, skip)):
+            pattern = _trie_regex(phrases)
+            if pattern is not None:
+                classes.append((name, f"(?i:{pattern})" if upper else pattern))
+        classes.extend((patterns or {}).items())
+
+        self.names = [name for name, _ in classes]
+        self._kinds = [name for name in (STOP, SKIP) if name in self.names]
+        self._regex = re.compile("".join(
+            f"(?:(?=.*?(?P<{name}>{pattern})))?" for name, pattern in classes
+        ))
+
+    def scan(self, line):
+        """
+        The match of every class on line: m[name] is the text found, None when absent.
+        m.start(name) / m.end(name) locate it in the line.
+        """
+        return self._regex.match(line)
+
+    def classify(self, line):
+        """
+        STOP, SKIP or None.
+        """
+        m = self._regex.match(line)
+        for kind in self._kinds:
+            if m[kind] is not None:
+                return kind
+        return None
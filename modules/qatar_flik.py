@@ -1,9 +1,27 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier, SKIP
+
+PARSER_VERSION = 1
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Ticket Types Per Title",
+        "Created 20",
+        "Screen Total"
+    ],
+)
+
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+FORMAT_RE = re.compile(r"(2D|3D|4D|4DX)", re.IGNORECASE)
+FORMAT_TAG_RE = re.compile(r"\(?\b(2D|3D|4D|4DX)\b(\s+(EN|AR|JA|HI))?\)?", re.IGNORECASE)
+SPACES_RE = re.compile(r"\s+")
+HOUR_RE = re.compile(r"\d{2}:\d{2}")
 
 
 # -------------------------------
@@ -41,11 +59,10 @@ def is_number(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -56,7 +73,7 @@ def extract_first_page(pdf_path):
     # extract dates
     line = lines[2]
 
-    found = re.findall(r"\d{4}-\d{2}-\d{2}", line)
+    found = ISO_DATE_RE.findall(line)
 
     if len(found) == 2:
         start = datetime.strptime(found[0], "%Y-%m-%d")
@@ -74,125 +91,110 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path):
+def extract_page2_details(doc):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-
-        current_movie = ""
-        current_time = ""
-        current_date=""
-        current_format = "2D"
-        ticket_class=""
-        screen_type = None
-
-  
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
-
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[6:] #remove first 6 lines
-
-            for line in lines:
-                admits = None
-                gross = None
-                net = None
-                stripped = line.strip()
-
-                skip_phrases = [
-                    "Ticket Types Per Title",
-                    "Created 20",
-                    "Screen Total"
-                ]
-
 
-
-                if any(p in stripped for p in skip_phrases):
-                    continue
-                
-                parts = stripped.split()
-                date_idx=None
-
-                #skip if has total
-                if (
-                      parts
-                      and parts[0].lower() == "total"
-                      and parts[-1].replace(",", "").replace(".", "").isdigit()
-                  ):
-                      continue
+    current_movie = ""
+    current_time = ""
+    current_date=""
+    current_format = "2D"
+    ticket_class=""
+    screen_type = None
+
+
+    # Loop from page 1 until last page
+    for text in doc.texts():
+
+        lines = text.splitlines()
+        lines = lines[6:] #remove first 6 lines
+
+        for line in lines:
+            admits = None
+            gross = None
+            net = None
+            stripped = line.strip()
+
+            if line_classes.classify(stripped) == SKIP:
+                continue
+            
+            parts = stripped.split()
+            date_idx=None
+
+            #skip if has total
+            if (
+                  parts
+                  and parts[0].lower() == "total"
+                  and parts[-1].replace(",", "").replace(".", "").isdigit()
+              ):
+                  continue
+            
+            #skip if total
+            if len(parts) == 2 and all(is_number(p) for p in parts):
+                continue
+
+
+            date_idx = next(
+            (i for i, p in enumerate(parts) if ISO_DATE_RE.fullmatch(p)),
+            None
+            )
+
+            if date_idx is not None:
+                current_date = parts[date_idx]   # keep original format
+                movie_parts = parts[:date_idx]
+
+                # detect format
+                for p in movie_parts:
+                    m = FORMAT_RE.search(p)
+                    if m:
+                        current_format = m.group(1).upper()
+
+                # clean movie title
+                current_movie = " ".join(movie_parts)
+                current_movie = FORMAT_TAG_RE.sub("", current_movie)
+                current_movie = SPACES_RE.sub(" ", current_movie).strip()
                 
-                #skip if total
-                if len(parts) == 2 and all(is_number(p) for p in parts):
-                    continue
 
-    
-                date_idx = next(
-                (i for i, p in enumerate(parts) if re.fullmatch(r"\d{4}-\d{2}-\d{2}", p)),
-                None
-                )
-
-                if date_idx is not None:
-                    current_date = parts[date_idx]   # keep original format
-                    movie_parts = parts[:date_idx]
-
-                    # detect format
-                    for p in movie_parts:
-                        m = re.search(r"(2D|3D|4D|4DX)", p, re.IGNORECASE)
-                        if m:
-                            current_format = m.group(1).upper()
-
-                    # clean movie title
-                    current_movie = " ".join(movie_parts)
-                    current_movie = re.sub(
-                        r"\(?\b(2D|3D|4D|4DX)\b(\s+(EN|AR|JA|HI))?\)?",
-                        "",
-                        current_movie,
-                        flags=re.IGNORECASE
-                    )
-                    current_movie = re.sub(r"\s+", " ", current_movie).strip()
-                    
-
-                # check if line has time like 21:10
-                for i, p in enumerate(parts):
-                    if re.fullmatch(r"\d{2}:\d{2}", p):
-                        current_time = p
-
-                        # gross = last part
-                        gross = clean_num(parts[-1])
-                        net=gross
-
-                        # admits = third from last
-                        admits = clean_num(parts[-3])
-
-                        # screen type = parts after time up to last 3
-                        screen_type = " ".join(parts[i+1:-3]).strip()
-     
-                if len(parts) == 3 and all(is_number(p) for p in parts):
+            # check if line has time like 21:10
+            for i, p in enumerate(parts):
+                if HOUR_RE.fullmatch(p):
+                    current_time = p
+
+                    # gross = last part
                     gross = clean_num(parts[-1])
-                    admits = clean_num(parts[-3])
                     net=gross
 
+                    # admits = third from last
+                    admits = clean_num(parts[-3])
 
-
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    screen_type,
-                    current_format,
-                    ticket_class,
-                    admits,
-                    gross,
-                    net,
-                    None,
-                    None,
-                    None
+                    # screen type = parts after time up to last 3
+                    screen_type = " ".join(parts[i+1:-3]).strip()
+
+            if len(parts) == 3 and all(is_number(p) for p in parts):
+                gross = clean_num(parts[-1])
+                admits = clean_num(parts[-3])
+                net=gross
+
+
+
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                screen_type,
+                current_format,
+                ticket_class,
+                admits,
+                gross,
+                net,
+                None,
+                None,
+                None
 
 
-                ])
+            ])
 
     return page2_rows
 
@@ -207,15 +209,15 @@ def fetch_data(pdf_path,exhibitor):
 
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-
-
-    # -------- PAGE 1 ----------
-    cinema_name, weekly = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
 
+        # -------- PAGE 1 ----------
+        cinema_name, weekly = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc)
     print(page2_data)
 
     for idx, r in enumerate(page2_data, start=1):
@@ -1,9 +1,30 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 2
+
+
+line_classes = LineClassifier(
+    skip=[
+        "QATAR BAHRAIN CINEMA",
+        "EMPIRE INTERNATIONAL",
+        "Screen Total"
+    ],
+    stop=["Distributor Total"],
+    patterns={
+        "movie_total": r"Movie Total",
+        "time": r"\b\d{1,2}:\d{2}\s?(?i:am|pm)\b",
+        "date": r"\b\d{2}/\d{2}/\d{4}\b",
+    },
+)
+
+MONEY_RE = re.compile(r"^[\d,]+(\.\d+)?$")
+
 
 
 # -------------------------------
@@ -30,7 +51,7 @@ def clean_num(x):
 
                     # helper to detect numeric money
 def is_money(x):
-    return re.match(r"^[\d,]+(\.\d+)?$", x)
+    return MONEY_RE.match(x)
 
 
 
@@ -45,11 +66,10 @@ def is_money(x):
 
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
 
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -65,97 +85,88 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path):
+def extract_page2_details(doc):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-
-        current_movie = ""
-        current_screen = ""
-        current_time = ""
-        current_date=""
-        current_format = "2D"
-        ticket_class=""
-        its_movie = True
 
-        # Loop from page 1 until last page
-        for page_index in range(0, len(pdf.pages)):
+    current_movie = ""
+    current_screen = ""
+    current_time = ""
+    current_date=""
+    current_format = "2D"
+    ticket_class=""
+    its_movie = True
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            lines = lines[5:] #remove first 5 lines
+    # Loop from page 1 until last page
+    for text in doc.texts():
 
-            for line in lines:
+        lines = text.splitlines()
+        lines = lines[5:] #remove first 5 lines
 
-                stripped = line.strip()
+        for line in lines:
 
+            stripped = line.strip()
 
-                skip_phrases = [
-                    "QATAR BAHRAIN CINEMA",
-                    "EMPIRE INTERNATIONAL",
-                    "Screen Total"
-                ]
+            m = line_classes.scan(stripped)
 
+            # break if Distributor Total
+            if m["stop"]:
+                doc.stop_pages()
+                break
 
-                # break if Distributor Total
-                if "Distributor Total" in stripped:
-                    break
+            if m["skip"]:
+                continue
 
-                if any(p in stripped for p in skip_phrases):
-                    continue
 
-  
-                #detect Movie
-                # detect Movie (first valid line only)
-                if its_movie:
-                    current_movie = stripped
-                    its_movie = False
-                    continue
+            #detect Movie
+            # detect Movie (first valid line only)
+            if its_movie:
+                current_movie = stripped
+                its_movie = False
+                continue
 
 
-                if "Movie Total" in stripped:
-                    its_movie = True
-                    continue
+            if m["movie_total"]:
+                its_movie = True
+                continue
 
-                if re.search(r"\b\d{1,2}:\d{2}\s?(am|pm)\b", stripped, re.IGNORECASE):
-                    # extract date dd/mm/yyyy
-                    date_match = re.search(r"\b\d{2}/\d{2}/\d{4}\b", stripped)
-                    current_date = date_match.group() if date_match else ""
-                    
+            if m["time"]:
+                # extract date dd/mm/yyyy
+                current_date = m["date"] or ""
+                
 
-                    # extract time
-                    time_match = re.search(r"\b\d{1,2}:\d{2}\s?(am|pm)\b", stripped, re.IGNORECASE)
-                    current_time = time_match.group() if time_match else ""
-                    
+                # extract time
+                current_time = m["time"]
+                
 
-                    parts = stripped.split()
+                parts = stripped.split()
 
-                    # defaults
-                    admits = 0
-                    net = 0
-                    gross = 0
-                    comps = 0
+                # defaults
+                admits = 0
+                net = 0
+                gross = 0
+                comps = 0
 
-                    # last part = money → net & gross
-                    if is_money(parts[-1]):
-                        net = float(parts[-1].replace(",", ""))
-                        gross = net
-                        
+                # last part = money → net & gross
+                if is_money(parts[-1]):
+                    net = float(parts[-1].replace(",", ""))
+                    gross = net
+                    
 
-                    # part -1 = admits
-                    if parts[-2].isdigit():
-                        admits = int(parts[-2])
-                        
+                # part -1 = admits
+                if parts[-2].isdigit():
+                    admits = int(parts[-2])
+                    
 
-                    # 4th from last logic for comps
-                    if len(parts) >= 4 and parts[3].isdigit():
-                      total_admits = int(parts[3])
-                      comps =  total_admits - admits
+                # 4th from last logic for comps
+                if len(parts) >= 4 and parts[3].isdigit():
+                  total_admits = int(parts[3])
+                  comps =  total_admits - admits
 
-                else:
-                    current_screen = stripped
-                    continue
+            else:
+                current_screen = stripped
+                continue
 
 
 
@@ -164,23 +175,23 @@ def extract_page2_details(pdf_path):
 
 
 
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    ticket_class,
-                    admits,
-                    gross,
-                    net,
-                    comps,
-                    None,
-                    None
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                ticket_class,
+                admits,
+                gross,
+                net,
+                comps,
+                None,
+                None
 
 
-                ])
+            ])
 
     return page2_rows
 
@@ -195,15 +206,15 @@ def fetch_data(pdf_path,exhibitor):
 
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-
-
-    # -------- PAGE 1 ----------
-    cinema_name = extract_first_page(pdf_path)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
 
+        # -------- PAGE 1 ----------
+        cinema_name = extract_first_page(doc)
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path)
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc)
     print(page2_data)
 
     for idx, r in enumerate(page2_data, start=1):
@@ -0,0 +1,337 @@
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from .document import open_document
+from .phrases import LineClassifier, SKIP
+
+
+# -------------------------------
+# DECLARATIVE EXHIBITOR PARSERS
+# The page loop the exhibitor modules write by hand: drop the page header lines, skip
+# noise lines, update the movie / date / screen / ... state from pattern lines and turn a
+# line ending in numbers into a row. An ExhibitorSpec declares those steps once, they are
+# compiled at import into one list of step functions, run over every line by run_spec.
+# -------------------------------
+END_OF_PAGE = object()
+
+ZEROS = ("0", "0.0", "0.00")
+
+# the 12 row columns after File / Exhibitor / Cinema / Week Type / Extraction Date
+STATE_DEFAULTS = {
+    "movie": "",
+    "date": "",
+    "time": "",
+    "screen": "",
+    "format": "2D",
+    "ticket_class": "",
+}
+
+
+def clean_num(x):
+    x = x.replace(",", "").strip()
+    try:
+        return float(x)
+    except ValueError:
+        return 0
+
+
+# -------------------------------
+# LINE RULES
+# Tried in order on every stripped line. A step returns the line for the next rule,
+# None when the line is consumed, END_OF_PAGE to drop the rest of the page.
+# -------------------------------
+class Skip:
+    """
+    Lines containing any of the phrases.
+    """
+
+    def __init__(self, phrases, upper=False):
+        self.classes = LineClassifier(skip=phrases, upper=upper)
+
+    def compile(self):
+        classify = self.classes.classify
+
+        def step(line, state):
+            return None if classify(line) == SKIP else line
+        return step
+
+
+class SkipMatch:
+    """
+    Lines matching the whole pattern.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = re.compile(pattern)
+
+    def compile(self):
+        fullmatch = self.pattern.fullmatch
+
+        def step(line, state):
+            return None if fullmatch(line) else line
+        return step
+
+
+class SkipRestOfPage:
+    """
+    The line equal to text and every line after it on the same page.
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def compile(self):
+        text = self.text
+
+        def step(line, state):
+            return END_OF_PAGE if line == text else line
+        return step
+
+
+class SetState:
+    """
+    A line matching pattern (searched anywhere) sets state fields from its groups and
+    gives no row. fields: {state field: group number}, group values are stripped.
+    upper: fields uppercased, values: {field: {value: replacement}} applied last.
+    """
+
+    def __init__(self, pattern, fields, upper=(), values=None):
+        self.pattern = re.compile(pattern)
+        self.fields = fields
+        self.upper = set(upper)
+        self.values = values or {}
+
+    def compile(self):
+        search = self.pattern.search
+        fields = [
+            (name, group, name in self.upper, self.values.get(name, {}))
+            for name, group in self.fields.items()
+        ]
+
+        def step(line, state):
+            m = search(line)
+            if not m:
+                return line
+            for name, group, upper, values in fields:
+                value = m.group(group).strip()
+                if upper:
+                    value = value.upper()
+                state[name] = values.get(value, value)
+            return None
+        return step
+
+
+class Rewrite:
+    """
+    Removes pattern (or replaces it with repl) before the next rules, line stripped again.
+    """
+
+    def __init__(self, pattern, repl=""):
+        self.pattern = re.compile(pattern)
+        self.repl = repl
+
+    def compile(self):
+        sub = self.pattern.sub
+        repl = self.repl
+
+        def step(line, state):
+            return sub(repl, line).strip()
+        return step
+
+
+# -------------------------------
+# NUMERIC TAIL
+# The row line: its last `width` tokens are numbers, the tokens before them a label.
+# -------------------------------
+class NumericTail:
+    """
+    fields: {"admits" / "gross" / "net" / any name: negative token index}.
+    label: state field set to the tokens before the tail (ticket class, movie...).
+    number: pattern each checked token must fully match, checked: the indexes tested,
+    all tail tokens by default. skip_zero drops lines whose tail is only zeros.
+    free: the field (a ticket price) at 0 of which admits are counted as comps.
+    """
+
+    def __init__(self, width, fields, label=None, number=r"[\d.,]*\d[\d.,]*",
+                 checked=None, skip_zero=False, free=None):
+        self.width = width
+        self.fields = fields
+        self.label = label
+        self.number = re.compile(number)
+        self.checked = tuple(checked) if checked is not None else tuple(range(-width, 0))
+        self.skip_zero = skip_zero
+        self.free = free
+
+    def row(self, line, state):
+        parts = line.split()
+        width = self.width
+        if len(parts) < width:
+            return None
+        if self.skip_zero and all(t in ZEROS for t in parts[-width:]):
+            return None
+        fullmatch = self.number.fullmatch
+        for i in self.checked:
+            if not fullmatch(parts[i]):
+                return None
+
+        if self.label:
+            state[self.label] = " ".join(parts[:-width])
+        values = {name: clean_num(parts[i]) for name, i in self.fields.items()}
+
+        admits = values.get("admits", 0)
+        comps = 0
+        if self.free and values[self.free] == 0:
+            admits, comps = 0, admits
+        return [
+            state["movie"],
+            state["date"],
+            state["time"],
+            state["screen"],
+            state["format"],
+            state["ticket_class"],
+            admits,
+            values.get("gross", 0),
+            values.get("net", 0),
+            comps,
+            None,
+            None
+        ]
+
+
+# -------------------------------
+# PAGE 0 HEADER
+# -------------------------------
+class Cinema:
+    """
+    Cinema name: one line of page 0, phrases removed.
+    """
+
+    def __init__(self, line=0, remove=()):
+        self.line = line
+        self.remove = remove
+
+    def read(self, lines):
+        if len(lines) <= self.line:
+            return ""
+        cinema = lines[self.line]
+        for phrase in self.remove:
+            cinema = cinema.replace(phrase, "")
+        return cinema.strip()
+
+
+class WeekFromPeriod:
+    """
+    "weekly" when the first two dates in the top lines of page 0 are more than
+    weekly_after days apart, "" otherwise.
+    """
+
+    def __init__(self, pattern, date_format, lines=10, weekly_after=1):
+        self.pattern = re.compile(pattern)
+        self.date_format = date_format
+        self.lines = lines
+        self.weekly_after = weekly_after
+
+    def read(self, lines):
+        dates = self.pattern.findall("\n".join(lines[:self.lines]))
+        if len(dates) < 2:
+            return ""
+        d1 = datetime.strptime(dates[0], self.date_format)
+        d2 = datetime.strptime(dates[1], self.date_format)
+        return "weekly" if (d2 - d1).days > self.weekly_after else ""
+
+
+class ReportDate:
+    """
+    Show date of every row, read from one line of page 0 and reformatted.
+    """
+
+    def __init__(self, line, pattern, date_format, out_format="%d/%m/%Y"):
+        self.line = line
+        self.pattern = re.compile(pattern)
+        self.date_format = date_format
+        self.out_format = out_format
+
+    def read(self, lines):
+        m = self.pattern.search(lines[self.line]) if len(lines) > self.line else None
+        if not m:
+            return ""
+        return datetime.strptime(m.group(), self.date_format).strftime(self.out_format)
+
+
+# -------------------------------
+# EXHIBITOR SPEC
+# -------------------------------
+class ExhibitorSpec:
+    """
+    One exhibitor's report layout. Used like an exhibitor module: it has fetch_data and
+    a PARSER_VERSION, so it can stand in module_map and in the parsed result cache.
+
+    cinema: Cinema. week: WeekFromPeriod or a fixed week type. start_date: ReportDate
+    or None. page_offset: header lines dropped from every page. rules: line rules in
+    order, tail: the NumericTail giving the rows. state: initial state overrides.
+    """
+
+    def __init__(self, name, version, cinema, week, rules, tail, page_offset=0,
+                 start_date=None, state=None):
+        self.__name__ = f"{__name__}.{name}_spec"
+        self.PARSER_VERSION = version
+        # what the parsed result cache hashes: the spec declarations and this engine
+        self.source_files = [os.path.join(os.path.dirname(__file__), "specs.py"), __file__]
+        self.cinema = cinema
+        self.week = week
+        self.start_date = start_date
+        self.page_offset = page_offset
+        self.rules = rules
+        self.tail = tail
+        self.state = {**STATE_DEFAULTS, **(state or {})}
+        # compiled once: one closure per rule, bound to its compiled patterns
+        self.steps = [rule.compile() for rule in rules]
+
+    def read_header(self, doc):
+        lines = [l.strip() for l in doc.page_text(0).splitlines()]
+        cinema = self.cinema.read(lines)
+        week_type = self.week if isinstance(self.week, str) else self.week.read(lines)
+        start_date = self.start_date.read(lines) if self.start_date else ""
+        return cinema, week_type, start_date
+
+    def fetch_data(self, pdf_path, exhibitor):
+        # pdf_path is a file path or the ParsedDocument the router already opened
+        with open_document(pdf_path) as doc:
+            f = os.path.basename(doc.path)
+            cinema, week_type, start_date = self.read_header(doc)
+            rows = run_spec(self, doc, start_date)
+
+        now_value = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return pd.DataFrame([[f, exhibitor, cinema, week_type, now_value] + r for r in rows])
+
+
+def run_spec(spec, doc, start_date=""):
+    """
+    The 12-column rows of every page, state carried from page to page.
+    """
+    state = dict(spec.state)
+    if start_date:
+        state["date"] = start_date
+
+    steps = spec.steps
+    row = spec.tail.row
+    offset = spec.page_offset
+    rows = []
+    for text in doc.texts():
+        for line in text.splitlines()[offset:]:
+            line = line.strip()
+            for step in steps:
+                line = step(line, state)
+                if line is None or line is END_OF_PAGE:
+                    break
+            if line is END_OF_PAGE:
+                break
+            if line is None:
+                continue
+            r = row(line, state)
+            if r is not None:
+                rows.append(r)
+    return rows
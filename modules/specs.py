@@ -0,0 +1,101 @@
+from .spec_engine import (
+    ExhibitorSpec, Skip, SkipMatch, SkipRestOfPage, SetState, Rewrite, NumericTail,
+    Cinema, WeekFromPeriod, ReportDate,
+)
+
+
+# -------------------------------
+# EXHIBITOR SPECS
+# Declarative versions of the hand-written exhibitor modules, run by spec_engine.
+# bor_main uses them in place of the module of the same name (EMPIRE_BOR_PARSERS=spec).
+# Check a spec against its module with benchmarks/spec_parity.py before adding it here.
+# An exhibitor with no hand-written module can be put in module_map as its spec.
+# -------------------------------
+kuwait_sky = ExhibitorSpec(
+    "kuwait_sky",
+    version=1,
+    cinema=Cinema(line=0),
+    week=WeekFromPeriod(r"\d{1,2}/\d{1,2}/\d{2,4}", "%d/%m/%Y", lines=10, weekly_after=1),
+    page_offset=1,
+    rules=[
+        # the module's Totals block never finds its closing line: the page ends there
+        SkipRestOfPage("Totals"),
+        Skip([
+            "Distributors Report by Film",
+            "Ticket Type",
+            "C:\\VISTA\\ReportFiles",
+            "Total for Film this Screen",
+            "Day Total",
+            "Movie Format",
+            "Split Movie Format",
+            "Ticket Detail Level",
+            "Detailed Distributors Report",
+            "Vista Entertainment Solutions",
+            "Empire(",
+            "Avg Ticket Price",
+            "EMPIRE ENTERTAINMENT",
+            "Ticket Prices Admits",
+        ]),
+        # purely numeric lines
+        SkipMatch(r"\d[\d ]*"),
+        SetState(
+            r"(?i)Film\s*:\s*([A-Z0-9 ()\-:'&]+?)\s*Format\s*:\s*([A-Z0-9]+)",
+            {"movie": 1, "format": 2},
+            upper=["format"],
+            values={"format": {"DEFAULT": "2D"}},
+        ),
+        Rewrite(r"(?i)\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday|After Midnight)\b"),
+        SetState(
+            r"(?i)\b(\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)-\d{2,4})\b",
+            {"date": 0},
+        ),
+    ],
+    # Admits, Net Price, Net, Gross Price, Gross
+    tail=NumericTail(
+        5,
+        {"admits": -5, "net": -3, "price": -2, "gross": -1},
+        label="ticket_class",
+        skip_zero=True,
+        free="price",
+    ),
+)
+
+
+kuwait_ozone_weekly = ExhibitorSpec(
+    "kuwait_ozone_weekly",
+    version=1,
+    cinema=Cinema(line=0, remove=["Distributors by Film and Ticket Type"]),
+    week="weekly",
+    start_date=ReportDate(2, r"\d{1,2}\s+[A-Za-z]+\s+\d{4}", "%d %B %Y"),
+    page_offset=5,
+    rules=[
+        Skip([
+            "Distributors by Film and Ticket Type",
+            "Vista Entertainment Solutions Ltd",
+            "REPORT DATE RANGE",
+            "Empire Film Distribution",
+            "GROSS TOTAL",
+        ]),
+    ],
+    # movie, then six columns: the last one checked, gross / net / admits read
+    tail=NumericTail(
+        6,
+        {"admits": -4, "net": -3, "gross": -1},
+        label="movie",
+        number=r"[\d,]+(\.\d+)?",
+        checked=[-1],
+    ),
+)
+
+
+SPECS = {
+    "kuwait_sky": kuwait_sky,
+    "kuwait_ozone_weekly": kuwait_ozone_weekly,
+}
+
+
+def spec_for(module):
+    """
+    The spec standing in for an exhibitor module, None if it has none.
+    """
+    return SPECS.get(module.__name__.rsplit(".", 1)[-1])
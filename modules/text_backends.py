@@ -0,0 +1,133 @@
+import os
+import re
+import importlib.util
+
+
+# Opt-in: "" = each exhibitor module's TEXT_BACKEND, pdfplumber when it has none (none
+# has one yet), or a backend name for every file
+TEXT_BACKEND = os.environ.get("EMPIRE_BOR_TEXT_BACKEND", "")
+# pages, spread over the file, extracted by both the fast backend and pdfplumber before
+# the fast one is trusted with the rest of it. 0 = every page. Only these pages are
+# compared: a text difference on any other page goes into the output unnoticed. The
+# other pages are only checked for being readable at all (InconsistentText).
+CHECK_PAGES = int(os.environ.get("EMPIRE_BOR_TEXT_CHECK_PAGES", "5"))
+
+_SPACES = re.compile(r"[ \t]+")
+
+
+def normalise_text(text):
+    """
+    A fast backend's page text in pdfplumber's shape: "\n" line ends, single spaces,
+    no blank lines at the ends.
+    """
+    return "\n".join(_SPACES.sub(" ", line).strip() for line in text.splitlines()).strip("\n")
+
+
+class InconsistentText(Exception):
+    """
+    A backend's page text that cannot be right, e.g. empty on a page with characters.
+    The file goes back to pdfplumber.
+    """
+
+
+# --------------------------
+# PAGE TEXT BACKENDS
+# --------------------------
+# A backend opens one PDF, has its page_count and returns the text of a page by index,
+# in pdfplumber's extract_text() shape, raising InconsistentText when it can tell that
+# text is wrong. pdfplumber itself is ParsedDocument's own path, the reference the
+# others are checked against.
+
+class PyPDF2Backend:
+    name = "pypdf2"
+
+    def __init__(self, path):
+        from PyPDF2 import PdfReader
+
+        self.reader = PdfReader(path)
+
+    @property
+    def page_count(self):
+        return len(self.reader.pages)
+
+    def page_text(self, index):
+        page = self.reader.pages[index]
+        text = normalise_text(page.extract_text() or "")
+        if not text and "/Font" in (page.get("/Resources") or {}):
+            raise InconsistentText(f"no text on page {index + 1}, which has fonts")
+        return text
+
+    def close(self):
+        self.reader = None
+
+
+class PdfiumBackend:
+    """
+    PDFium's text layer through pypdfium2: no layout analysis, the text in content order.
+    """
+    name = "pdfium"
+
+    def __init__(self, path):
+        import pypdfium2
+
+        self.pdf = pypdfium2.PdfDocument(path)
+
+    @property
+    def page_count(self):
+        return len(self.pdf)
+
+    def page_text(self, index):
+        page = self.pdf[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                text = normalise_text(textpage.get_text_bounded())
+                if not text and textpage.count_chars() > 0:
+                    raise InconsistentText(f"no text on page {index + 1}, which has characters")
+                return text
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+
+BACKENDS = {
+    "pypdf2": (PyPDF2Backend, "PyPDF2"),
+    "pdfium": (PdfiumBackend, "pypdfium2"),
+}
+
+
+def available(name):
+    return name in BACKENDS and importlib.util.find_spec(BACKENDS[name][1]) is not None
+
+
+def backend_for(module):
+    """
+    Name of the backend for the files of an exhibitor module, "pdfplumber" when the
+    configured one is not installed.
+    """
+    name = TEXT_BACKEND or getattr(module, "TEXT_BACKEND", "pdfplumber")
+    return name if available(name) else "pdfplumber"
+
+
+def open_backend(name, path):
+    return BACKENDS[name][0](path)
+
+
+def check_indexes(page_count, check_pages):
+    """
+    The pages a fast backend is checked on: check_pages of them, the first and the last
+    included and the others evenly between. Every page when check_pages is 0 or the file
+    has no more pages than that, none when it is None (benchmarks).
+    """
+    if check_pages is None:
+        return []
+    if check_pages <= 0 or check_pages >= page_count:
+        return list(range(page_count))
+    if check_pages == 1:
+        return [0]
+    step = (page_count - 1) / (check_pages - 1)
+    return sorted({round(k * step) for k in range(check_pages)})
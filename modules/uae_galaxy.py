@@ -1,10 +1,38 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier
+
+PARSER_VERSION = 1
+
 screens =["Screen 1","Screen 2","Screen 3","Screen 4","Screen 5","Screen 6","Screen 7","Screen 8","Screen 9","Screen 10","Screen 11","Screen 12","Screen 13","Screen 14","Screen 15"]
+screens_upper = [scr.upper() for scr in screens]
+
+
+# Time patterns: 6:30, 06:30, 6:30 PM, 6:30AM
+TIME_RE = re.compile(r"\b\d{1,2}:\d{2}(?:\s?[APMapm]{2})?\b")
+
+line_classes = LineClassifier(
+    skip=[
+        "TICKETTYPE",
+        "WEEKLY DISTRIBUTOR REPORT",
+        "GRAND TOTAL",
+        "DAY TOTAL",
+        "TOTAL FOR FILM THIS SCREEN"
+    ],
+    patterns={
+        "time": TIME_RE.pattern,
+        # Date patterns: 2025-09-16 or 2025/09/16
+        "iso_date": r"\b\d{4}[-/]\d{2}[-/]\d{2}\b",
+        # only AED, digits, dots, commas and spaces, with an AED somewhere
+        "aed_only": r"^(?=.*?(?i:AED))[AEDaed0-9.,\s]*$",
+        "screen": "(?i:" + "|".join(re.escape(scr) for scr in screens_upper) + ")",
+    },
+    upper=True,
+)
 
 
 # -------------------------
@@ -30,22 +58,7 @@ def is_date(val):
 def contains_time(text):
     if not text:
         return False
-    return bool(re.search(r"\b\d{1,2}:\d{2}(?:\s?[APMapm]{2})?\b", text))
-
-def date_and_time_detected(text):
-    if not text:
-        return False
-
-    # Time patterns: 6:30, 06:30, 6:30 PM, 6:30AM
-    time_pattern = r"\b\d{1,2}:\d{2}(?:\s?[APMapm]{2})?\b"
-
-    # Date patterns: 2025-09-16 or 2025/09/16
-    date_pattern = r"\b\d{4}[-/]\d{2}[-/]\d{2}\b"
-
-    has_time = bool(re.search(time_pattern, text))
-    has_date = bool(re.search(date_pattern, text))
-
-    return has_time and has_date
+    return bool(TIME_RE.search(text))
 
 
 
@@ -78,68 +91,48 @@ def last_seven_are_numbers(row):
 
 def detect_screen_and_movie(line):
     line_upper = line.upper()
-    for scr in screens:
-        scr=scr.upper()
+    for scr in screens_upper:
         if scr in line_upper:
             screen = scr
             movie = line_upper.replace(scr, "").strip()
             return screen, movie
     return None, None
 
-def is_only_aed_and_numbers(text):
-    if not text:
-        return False
-
-    # remove spaces to simplify
-    t = text.strip()
-
-    # must contain AED
-    if "AED" not in t.upper():
-        return False
-
-    # allow: A E D digits dot comma space
-    cleaned = re.sub(r"[AEDaed0-9.,\s]", "", t)
-
-    # if ANY other character remains, reject
-    return cleaned == ""
-
 
 
 # -------------------------
 # HEADER INFO (Cinema + Weekly)
 # -------------------------
-def extract_header_info(pdf_path):
+def extract_header_info(doc):
     cinema = ""
     week_tag = ""
 
-    with pdfplumber.open(pdf_path) as pdf:
-        first_page = pdf.pages[0]
-        lines = first_page.extract_text().splitlines() if first_page.extract_text() else []
-
-        '''
-        # CINEMA NAME = first non-empty line
-        for ln in lines:
-            if ln.strip():
-                cinema = ln.strip()
-                break
-
-
-        # WEEKLY DETECTION
-        for ln in lines:
-            L = ln.upper()
-            if "Ticket Detail Level" in L:
-                parts = ln.split()
-                # Example: Screening Period 2025-09-11 TO 2025-09-17
-                d1 = datetime.strptime(parts[-3], "%d-%m-%Y")
-                d2 = datetime.strptime(parts[-8], "%d-%m-%Y")
-                week_tag = "weekly" if (d2 - d1).days > 1 else ""
-                break
-
-                Weekly Distributor Report
-        '''
-        cinema = lines[0] if len(lines) > 0 else ""
-        if len(lines) > 1 and "weekly distributor report".lower() in lines[1].lower():
-          week_tag = "weekly"
+    lines = doc.page_lines(0)
+
+    '''
+    # CINEMA NAME = first non-empty line
+    for ln in lines:
+        if ln.strip():
+            cinema = ln.strip()
+            break
+
+
+    # WEEKLY DETECTION
+    for ln in lines:
+        L = ln.upper()
+        if "Ticket Detail Level" in L:
+            parts = ln.split()
+            # Example: Screening Period 2025-09-11 TO 2025-09-17
+            d1 = datetime.strptime(parts[-3], "%d-%m-%Y")
+            d2 = datetime.strptime(parts[-8], "%d-%m-%Y")
+            week_tag = "weekly" if (d2 - d1).days > 1 else ""
+            break
+
+            Weekly Distributor Report
+    '''
+    cinema = lines[0] if len(lines) > 0 else ""
+    if len(lines) > 1 and "weekly distributor report".lower() in lines[1].lower():
+      week_tag = "weekly"
 
     return cinema, week_tag
 
@@ -147,9 +140,9 @@ def extract_header_info(pdf_path):
 # -------------------------
 # EXTRACT PDF TABLES
 # -------------------------
-def extract_pdf(pdf_path,exhibitor):
+def extract_pdf(doc,exhibitor):
 
-    cinema, week_tag = extract_header_info(pdf_path)
+    cinema, week_tag = extract_header_info(doc)
     rows = []
 
     current_movie = ""
@@ -160,116 +153,113 @@ def extract_pdf(pdf_path,exhibitor):
     prev_line= None # Initialize prev_line
     previous_row = None # Initialize previous_row
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for pidx, page in enumerate(pdf.pages, start=1):
-            lines = page.extract_text().splitlines() if page.extract_text() else []
-            # skip first rows depending on page
-            if pidx == 1:
-              skip_n = 6
-            else:
-              skip_n = 4
-
-            lines = lines[skip_n:]   # remove first N lines
-
-            fake_table = []
-            for ln in lines:
-                ln = ln.strip()
-                if not ln:
-                    continue
-                # skip garbage / header lines
-
-                # split respecting multiple spaces and keep empty slots
-                parts = ln.replace("\t", " ").split(" ")
-                parts = [p for p in parts if p != ""]  # collapse extra spaces
-                fake_table=[]
-                fake_table.append(parts)
-
-                if ("TICKETTYPE" in ln.upper() or
-                    "WEEKLY DISTRIBUTOR REPORT" in ln.upper() or
-                    "GRAND TOTAL" in ln.upper() or
-                    "DAY TOTAL" in ln.upper() or
-                    "TOTAL FOR FILM THIS SCREEN" in ln.upper() or
-                    ln==cinema or
-                    date_and_time_detected(ln)==True or
-                    is_only_aed_and_numbers(ln)==True
-                ):
-                      prev_line=ln
-                      prev_row = fake_table[0]
-                      continue
-
-                # feed the rest of your script with fake rows
-                for row in fake_table:
-                        if not row:
-                            prev_row = row
-                            prev_line=ln
-                            continue
-
-                        # ----------------------------------
-                        # Extract ROW DATA
-                        # ----------------------------------
-
-                        try:
-                          temp_show_time = None
-                          temp_screen= None
-                          nbr_row= row
-                          if is_date(row[0]):
-                            show_date = row[0]
-                            continue
-
-                          if contains_time(row[0]):
-                            show_time= row[0]
-                            continue
-
-                          #detect movie and screen
-                          screen, movie_name = detect_screen_and_movie(ln)
-
-
-                          if screen:
-                            current_movie = movie_name
-                            current_screen = screen
-                            continue
-
-
-                          ticket_type=" ".join(row[1:-7])
-                          row=row[-7:]
-                          avg_price   = clean_num(row[0].replace("AED",""))
-                          admits      = clean_num(row[2])
-                          comps       = clean_num(row[1])
-                          grs         = clean_num(row[3].replace("AED",""))
-                          vat         = clean_num(row[4].replace("AED",""))
-                          mtax        = clean_num(row[5].replace("AED",""))
-                          net         = clean_num(row[6].replace("AED",""))
-
-                          #print(f"{show_date}, {screen}, {show_time}, {admits}, {grs}")
-                          movie_format = "2D"
-
-                          rows.append([
-                              pdf_path,
-                              exhibitor,
-                              cinema,
-                              week_tag,
-                              datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                              current_movie,
-                              show_date,
-                              show_time,
-                              current_screen,
-                              movie_format,
-                              ticket_type,
-                              admits,
-                              grs,
-                              net,
-                              comps,
-                              None,
-                              None
-                          ])
-                        except Exception:
-                          prev_row = row
-                          prev_line=ln
-                          continue
+    for pidx, text in enumerate(doc.texts(), start=1):
+        lines = text.splitlines()
+        # skip first rows depending on page
+        if pidx == 1:
+          skip_n = 6
+        else:
+          skip_n = 4
 
+        lines = lines[skip_n:]   # remove first N lines
 
+        fake_table = []
+        for ln in lines:
+            ln = ln.strip()
+            if not ln:
+                continue
+            # skip garbage / header lines
+
+            # split respecting multiple spaces and keep empty slots
+            parts = ln.replace("\t", " ").split(" ")
+            parts = [p for p in parts if p != ""]  # collapse extra spaces
+            fake_table=[]
+            fake_table.append(parts)
+
+            m = line_classes.scan(ln)
+            if (m["skip"] or
+                ln==cinema or
+                (m["time"] and m["iso_date"]) or
+                m["aed_only"]
+            ):
+                  prev_line=ln
+                  prev_row = fake_table[0]
+                  continue
+
+            # feed the rest of your script with fake rows
+            for row in fake_table:
+                    if not row:
                         prev_row = row
                         prev_line=ln
+                        continue
+
+                    # ----------------------------------
+                    # Extract ROW DATA
+                    # ----------------------------------
+
+                    try:
+                      temp_show_time = None
+                      temp_screen= None
+                      nbr_row= row
+                      if is_date(row[0]):
+                        show_date = row[0]
+                        continue
+
+                      if contains_time(row[0]):
+                        show_time= row[0]
+                        continue
+
+                      #detect movie and screen
+                      # which screen: the first of the list, as before
+                      screen, movie_name = detect_screen_and_movie(ln) if m["screen"] else (None, None)
+
+
+                      if screen:
+                        current_movie = movie_name
+                        current_screen = screen
+                        continue
+
+
+                      ticket_type=" ".join(row[1:-7])
+                      row=row[-7:]
+                      avg_price   = clean_num(row[0].replace("AED",""))
+                      admits      = clean_num(row[2])
+                      comps       = clean_num(row[1])
+                      grs         = clean_num(row[3].replace("AED",""))
+                      vat         = clean_num(row[4].replace("AED",""))
+                      mtax        = clean_num(row[5].replace("AED",""))
+                      net         = clean_num(row[6].replace("AED",""))
+
+                      #print(f"{show_date}, {screen}, {show_time}, {admits}, {grs}")
+                      movie_format = "2D"
+
+                      rows.append([
+                          doc.path,
+                          exhibitor,
+                          cinema,
+                          week_tag,
+                          datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                          current_movie,
+                          show_date,
+                          show_time,
+                          current_screen,
+                          movie_format,
+                          ticket_type,
+                          admits,
+                          grs,
+                          net,
+                          comps,
+                          None,
+                          None
+                      ])
+                    except Exception:
+                      prev_row = row
+                      prev_line=ln
+                      continue
+
+
+                    prev_row = row
+                    prev_line=ln
 
     return rows
 
@@ -280,7 +270,9 @@ def extract_pdf(pdf_path,exhibitor):
 
 def fetch_data(pdf_path,exhibitor):
   all_rows = []
-  all_rows.extend(extract_pdf(pdf_path,exhibitor))
+  # pdf_path is a file path or the ParsedDocument the router already opened
+  with open_document(pdf_path) as doc:
+    all_rows.extend(extract_pdf(doc,exhibitor))
   columns = [
       "File", "Exhibitor","Cinema", "Week Type", "Extraction Date","Movie","Date","Time", "Screen" , "Format", "Ticket Type","Admits","Gross","Net", "Comp" ,"Is Summary",   "Summary Sessions"]
   df = pd.DataFrame(all_rows, columns=columns)
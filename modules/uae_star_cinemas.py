@@ -1,9 +1,29 @@
-import pdfplumber
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import LineClassifier, SKIP
+
+PARSER_VERSION = 1
+
+
+line_classes = LineClassifier(
+    skip=[
+        "DISTRIBUTOR REPORT",
+        "SCREENING PERIOD",
+        "TKT PRICE",
+        "ADMITS",
+        "TOTAL",
+        "DISTRIBUTOR NAME",
+        "GENERATED ON"
+    ],
+    upper=True,
+)
+
+TIME_RE = re.compile(r"\b\d{1,2}:\d{2}\b")
+HOUR_RE = re.compile(r"^\d{1,2}:\d{2}$")
 
 
 # -------------------------
@@ -29,7 +49,7 @@ def is_date(val):
 def contains_time(text):
     if not text:
         return False
-    return bool(re.search(r"\b\d{1,2}:\d{2}\b", text))
+    return bool(TIME_RE.search(text))
 
 import re
 
@@ -70,7 +90,7 @@ def get_time_screen(row):
         cell_str = str(cell).strip()
 
         # detect HH:MM
-        if re.match(r"^\d{1,2}:\d{2}$", cell_str):
+        if HOUR_RE.match(cell_str):
             hour = cell_str
             hour_idx = i
             continue
@@ -92,29 +112,28 @@ def get_time_screen(row):
 # -------------------------
 # HEADER INFO (Cinema + Weekly)
 # -------------------------
-def extract_header_info(pdf_path):
+def extract_header_info(doc):
     cinema = ""
     week_tag = ""
 
-    with pdfplumber.open(pdf_path) as pdf:
-        lines = pdf.pages[0].extract_text().splitlines()
-
-        # CINEMA NAME = first non-empty line
-        for ln in lines:
-            if ln.strip():
-                cinema = ln.strip()
-                break
-
-        # WEEKLY DETECTION
-        for ln in lines:
-            L = ln.upper()
-            if "SCREENING PERIOD" in L and "TO" in L:
-                parts = ln.split()
-                # Example: Screening Period 2025-09-11 TO 2025-09-17
-                d1 = datetime.strptime(parts[-3], "%Y-%m-%d")
-                d2 = datetime.strptime(parts[-1], "%Y-%m-%d")
-                week_tag = "Weekly" if (d2 - d1).days > 0 else ""
-                break
+    lines = doc.page_lines(0)
+
+    # CINEMA NAME = first non-empty line
+    for ln in lines:
+        if ln.strip():
+            cinema = ln.strip()
+            break
+
+    # WEEKLY DETECTION
+    for ln in lines:
+        L = ln.upper()
+        if "SCREENING PERIOD" in L and "TO" in L:
+            parts = ln.split()
+            # Example: Screening Period 2025-09-11 TO 2025-09-17
+            d1 = datetime.strptime(parts[-3], "%Y-%m-%d")
+            d2 = datetime.strptime(parts[-1], "%Y-%m-%d")
+            week_tag = "Weekly" if (d2 - d1).days > 0 else ""
+            break
 
     return cinema, week_tag
 
@@ -122,9 +141,9 @@ def extract_header_info(pdf_path):
 # -------------------------
 # EXTRACT PDF TABLES
 # -------------------------
-def extract_pdf(pdf_path,exhibitor):
+def extract_pdf(doc,exhibitor):
 
-    cinema, week_tag = extract_header_info(pdf_path)
+    cinema, week_tag = extract_header_info(doc)
     rows = []
 
     current_movie = ""
@@ -135,120 +154,113 @@ def extract_pdf(pdf_path,exhibitor):
     prev_line= None # Initialize prev_line
     previous_row = None # Initialize previous_row
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for pidx, page in enumerate(pdf.pages, start=1):
-
-            lines = page.extract_text().splitlines() if page.extract_text() else []
-            fake_table = []
-            for ln in lines:
-                ln = ln.strip()
-                if not ln:
-                    continue
-                # skip garbage / header lines
-
-                # split respecting multiple spaces and keep empty slots
-                parts = ln.replace("\t", " ").split(" ")
-                parts = [p for p in parts if p != ""]  # collapse extra spaces
-                fake_table=[]
-                fake_table.append(parts)
-
-                if ("DISTRIBUTOR REPORT" in ln.upper() or
-                    "SCREENING PERIOD" in ln.upper() or
-                    "TKT PRICE" in ln.upper() or
-                    "ADMITS" in ln.upper() or
-                    "TOTAL" in ln.upper() or
-                    "DISTRIBUTOR NAME" in ln.upper() or
-                    "GENERATED ON" in ln.upper() or
-                    ln=="-" or
-                    ln==cinema
-                ):
-                      prev_line=ln
-                      prev_row = fake_table[0]
-                      continue
+    for pidx, text in enumerate(doc.texts(), start=1):
 
-                # feed the rest of your script with fake rows
-                for row in fake_table:
-                        if not row:
-                            prev_row = row
+        lines = text.splitlines()
+        fake_table = []
+        for ln in lines:
+            ln = ln.strip()
+            if not ln:
+                continue
+            # skip garbage / header lines
+
+            # split respecting multiple spaces and keep empty slots
+            parts = ln.replace("\t", " ").split(" ")
+            parts = [p for p in parts if p != ""]  # collapse extra spaces
+            fake_table=[]
+            fake_table.append(parts)
+
+            if (line_classes.classify(ln) == SKIP or
+                ln=="-" or
+                ln==cinema
+            ):
+                  prev_line=ln
+                  prev_row = fake_table[0]
+                  continue
+
+            # feed the rest of your script with fake rows
+            for row in fake_table:
+                    if not row:
+                        prev_row = row
+                        prev_line=ln
+                        continue
+
+                    # ----------------------------------
+                    # Extract ROW DATA
+                    # ----------------------------------
+
+                    try:
+                      temp_show_time = None
+                      temp_screen= None
+                      nbr_row= row
+                      if is_date(row[0]):
+                        show_date = row[0]
+                        temp_show_time, temp_screen= get_time_screen(row)
+
+                      else:
+
+                        if prev_line and ("TKT PRICE" in prev_line.upper() or "MOVIE TOTAL" in prev_line.upper()):
+                          if not last_seven_are_numbers(row):
+                            current_movie=ln
+                            prev_row = fake_table[0]
                             prev_line=ln
+
                             continue
 
-                        # ----------------------------------
-                        # Extract ROW DATA
-                        # ----------------------------------
-
-                        try:
-                          temp_show_time = None
-                          temp_screen= None
-                          nbr_row= row
-                          if is_date(row[0]):
-                            show_date = row[0]
-                            temp_show_time, temp_screen= get_time_screen(row)
-
-                          else:
-
-                            if prev_line and ("TKT PRICE" in prev_line.upper() or "MOVIE TOTAL" in prev_line.upper()):
-                              if not last_seven_are_numbers(row):
-                                current_movie=ln
-                                prev_row = fake_table[0]
-                                prev_line=ln
-
-                                continue
-
-                          if temp_show_time not in ["", None]: # if there is date, scen and show time skip tehse columns to unify
-                              nbr_row = row[3:]
-
-                          #print(nbr_row)
-                          show_date   = row[0] if is_date(row[0]) else show_date
-                          screen      = temp_screen if temp_screen not in ["", None] else screen
-                          show_time   = temp_show_time if temp_show_time not in ["", None] else show_time
-
-
-                          ticket_type_parts = nbr_row[:-7]      # everything except last 7
-                          ticket_type = " ".join(ticket_type_parts)
-                          ticket_type=ticket_type.replace(show_time,"")
-                          nbr_row = row[-7:] # get last seven columns
-                          avg_price   = clean_num(nbr_row[0])
-                          admits      = clean_num(nbr_row[1])
-                          comps       = clean_num(nbr_row[2])
-                          grs         = clean_num(nbr_row[3])
-                          vat         = clean_num(nbr_row[4])
-                          mtax        = clean_num(nbr_row[5])
-                          net         = clean_num(nbr_row[6])
-
-                          #print(f"{show_date}, {screen}, {show_time}, {admits}, {grs}")
-                          movie_format = "2D"
-                          if "DOLBY" in ticket_type.upper():
-                              movie_format = "DOLBY"
-
-                          rows.append([
-                              pdf_path,
-                              exhibitor,
-                              cinema,
-                              week_tag,
-                              datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                              current_movie,
-                              show_date,
-                              show_time,
-                              screen,
-                              movie_format,
-                              ticket_type,
-                              admits,
-                              grs,
-                              net,
-                              comps,
-                              None,
-                              None
-                          ])
-
-                        except Exception:
-                          prev_row = row
-                          prev_line=ln
-                          continue
+                      if temp_show_time not in ["", None]: # if there is date, scen and show time skip tehse columns to unify
+                          nbr_row = row[3:]
+
+                      #print(nbr_row)
+                      show_date   = row[0] if is_date(row[0]) else show_date
+                      screen      = temp_screen if temp_screen not in ["", None] else screen
+                      show_time   = temp_show_time if temp_show_time not in ["", None] else show_time
+
+
+                      ticket_type_parts = nbr_row[:-7]      # everything except last 7
+                      ticket_type = " ".join(ticket_type_parts)
+                      ticket_type=ticket_type.replace(show_time,"")
+                      nbr_row = row[-7:] # get last seven columns
+                      avg_price   = clean_num(nbr_row[0])
+                      admits      = clean_num(nbr_row[1])
+                      comps       = clean_num(nbr_row[2])
+                      grs         = clean_num(nbr_row[3])
+                      vat         = clean_num(nbr_row[4])
+                      mtax        = clean_num(nbr_row[5])
+                      net         = clean_num(nbr_row[6])
+
+                      #print(f"{show_date}, {screen}, {show_time}, {admits}, {grs}")
+                      movie_format = "2D"
+                      if "DOLBY" in ticket_type.upper():
+                          movie_format = "DOLBY"
+
+                      rows.append([
+                          doc.path,
+                          exhibitor,
+                          cinema,
+                          week_tag,
+                          datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                          current_movie,
+                          show_date,
+                          show_time,
+                          screen,
+                          movie_format,
+                          ticket_type,
+                          admits,
+                          grs,
+                          net,
+                          comps,
+                          None,
+                          None
+                      ])
+
+                    except Exception:
+                      prev_row = row
+                      prev_line=ln
+                      continue
 
 
-                        prev_row = row
-                        prev_line=ln
+                    prev_row = row
+                    prev_line=ln
 
     return rows
 
@@ -259,7 +271,9 @@ def extract_pdf(pdf_path,exhibitor):
 
 def fetch_data(pdf_path,exhibitor):
   all_rows = []
-  all_rows.extend(extract_pdf(pdf_path,exhibitor))
+  # pdf_path is a file path or the ParsedDocument the router already opened
+  with open_document(pdf_path) as doc:
+    all_rows.extend(extract_pdf(doc,exhibitor))
   columns = [
       "File", "Exhibitor","Cinema", "Week Type", "Extraction Date","Movie","Date","Time", "Screen" , "Format", "Ticket Type","Admits","Gross","Net", "Comp" ,"Is Summary",   "Summary Sessions"]
   df = pd.DataFrame(all_rows, columns=columns)
@@ -1,10 +1,17 @@
-import pdfplumber
 import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime
 import re
 
+from .document import open_document
+from .phrases import PhraseMatcher, LineClassifier
+
+PARSER_VERSION = 2
+
+# every page is read, none skipped: long reports are extracted in parallel first (bor_main)
+PAGE_PARALLEL = True
+
 
 
 #FORMATS
@@ -18,6 +25,35 @@ formats = ["2D", "3D", "4D", "IMAX 3D", "IMAX", "ATMOS", "MX4D", "DOLBY", "4DX",
            "4DX-2D","4DX-3D", "4DX-4D","IMAX-2D","IMAX-2","MAJL/7 STA","7 STA","7 STAR 2D","KIDS SC 2D" 
            ]
 
+formats_set = {f.upper() for f in formats}
+format_matcher = PhraseMatcher(formats)
+
+
+line_classes = LineClassifier(
+    skip=[
+        "Total for Film this Screen",
+        "Day Total",
+        "Movie Format",
+        "Split Movie Format",
+        "Ticket Detail Level",
+        "Detailed Distributors Report",
+        "Vista Entertainment Solutions",
+        "Empire(",
+        "Avg Ticket Price",
+        "Empire International",
+        "EMPIRE ENTERTAINMENT",
+        "Empire International Gulf",
+        "Ticket Prices Admits"
+    ],
+    patterns={
+        "show_date": r"(?i:\b(\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)-\d{2,4})\b)",
+    },
+)
+
+MAX_SCREEN_RE = re.compile(r'^MAX\s*\d*$', re.IGNORECASE)
+HEADER_DATE_RE = re.compile(r"\d{1,2}[-/]\d{1,2}[-/]\d{2,4}")
+HOUR_RE = re.compile(r"\d{1,2}:\d{2}")
+
 
 # -------------------------------
 # PAGE OUTPUT COLUMNS
@@ -29,7 +65,7 @@ OUTPUT_COLUMNS_PAGE = [
 # chekc if screen is MAX then format should be MAX 2D or MAX 3D if not already detected
 def build_max_label(var1, var2):
     # check if var1 starts with MAX (optionally followed by space and digits)
-    if re.match(r'^MAX\s*\d*$', var1, re.IGNORECASE):
+    if MAX_SCREEN_RE.match(var1):
         if var2.upper() in ['2D', '3D']:
             print(f"MAX {var2.upper()}")
             return f"MAX {var2.upper()}"
@@ -109,11 +145,10 @@ def is_data_row(tokens):
     return numeric_count >= 2    # real data rows ALWAYS have multiple numeric tail tokens
 
 
-def extract_first_page(pdf_path):
+def extract_first_page(doc):
 
     week_type=""
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text() or ""
+    text = doc.page_text(0)
 
     # Split into lines
     lines = [l.strip() for l in text.splitlines()]
@@ -136,7 +171,7 @@ def extract_first_page(pdf_path):
     '''
 
     #dates = re.findall(r"\d{1,2}/\d{1,2}/\d{2,4}", "\n".join(lines[:10]))
-    dates = re.findall(r"\d{1,2}[-/]\d{1,2}[-/]\d{2,4}", "\n".join(lines[:10]))
+    dates = HEADER_DATE_RE.findall("\n".join(lines[:10]))
 
     date_value = dates[0].replace("-", "/") if dates else ""
     if len(dates) >= 2:
@@ -204,7 +239,7 @@ def extract_first_page(pdf_path):
             for n in range(4, 0, -1):  # try length 4, 3, 2, 1
                 if len(the_split) >= n:
                     candidate = " ".join(the_split[-n:])
-                    if candidate.upper() in formats:
+                    if candidate.upper() in formats_set:
                         movie_format = candidate
                         movie_name_tokens = the_split[:-n]
                         break
@@ -255,215 +290,190 @@ def extract_first_page(pdf_path):
 # Identifies movie → screen → date → time → format → ticket class rows
 # Follows all your detection & skipping rules
 # ---------------------------------------
-def extract_page2_details(pdf_path, movie_list):
+def extract_page2_details(doc, movie_list):
 
     page2_rows = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    current_movie = ""
+    current_screen = ""
+    current_date = ""
+    current_time = ""
+    current_format = "2D"
 
-        current_movie = ""
-        current_screen = ""
-        current_date = ""
-        current_time = ""
-        current_format = "2D"
+    # one pass per line finds the longest movie name in it
+    movie_matcher = PhraseMatcher(movie_list)
 
 
-        # Loop from page 2 until last page
-        for page_index in range(1, len(pdf.pages)):
-            #print("Page 2 started")
+    # Loop from page 2 until last page
+    for text in doc.texts(1):
+        #print("Page 2 started")
 
-            text = pdf.pages[page_index].extract_text() or ""
-            lines = text.splitlines()
-            #lines = lines[5:] #remove first 5 lines
+        lines = text.splitlines()
+        #lines = lines[5:] #remove first 5 lines
 
 
-            skip=1
-            for line in lines:
-                #print(line)
-                #if "Split Movie Format".lower() in line.lower():
-                #  skip=0
-                #  continue
+        skip=1
+        for line in lines:
+            #print(line)
+            #if "Split Movie Format".lower() in line.lower():
+            #  skip=0
+            #  continue
 
-                #if skip ==1:
-                #  continue
+            #if skip ==1:
+            #  continue
 
 
-                stripped = line.strip()
+            stripped = line.strip()
 
-                skip_phrases = [
-                    "Total for Film this Screen",
-                    "Day Total",
-                    "Movie Format",
-                    "Split Movie Format",
-                    "Ticket Detail Level",
-                    "Detailed Distributors Report",
-                    "Vista Entertainment Solutions",
-                    "Empire(",
-                    "Avg Ticket Price",
-                    "Empire International",
-                    "EMPIRE ENTERTAINMENT",
-                    "Empire International Gulf",
-                    "Split Movie Format",
-                    "Ticket Prices Admits"
-                ]
+            if line.strip() == "Empire":
+              continue
 
-                if line.strip() == "Empire":
-                  continue
 
+            m = line_classes.scan(stripped)
+            if m["skip"]:
+                #print("skip")
+                continue
 
-                if any(p in stripped for p in skip_phrases):
-                    #print("skip")
-                    continue
+            # Skip purely numeric lines
+            if stripped.replace(" ", "").isdigit():
+                #print("skip")
+                continue
 
-                # Skip purely numeric lines
-                if stripped.replace(" ", "").isdigit():
-                    #print("skip")
-                    continue
+            # Date detection
+            #print("Date Detection Stated")
+            #m = re.search(r"\b(\d{1,2}/\d{1,2}/\d{2,4})\b", stripped)
+            if m["show_date"]:
+                #current_date = normalize_date(m.group(0))
+                current_date = m["show_date"]
+                #print("Date:")
+                #print(current_date)
+                continue
 
-                # Date detection
-                #print("Date Detection Stated")
-                #m = re.search(r"\b(\d{1,2}/\d{1,2}/\d{2,4})\b", stripped)
-                m = re.search(r"\b(\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)-\d{2,4})\b",
-                    stripped,
-                  re.IGNORECASE
-                )
-                if m:
-                    #current_date = normalize_date(m.group(0))
-                    current_date = m.group(0) 
-                    #print("Date:")
-                    #print(current_date)
-                    continue
+            parts = stripped.split()
 
-                parts = stripped.split()
-
-                # Movie detection (line contains the movie name)
-                #print("Movie Deteciton Stareted")
-                for mv in movie_list:
-                    if mv in stripped:
-                        current_movie = mv
-                        #print(current_movie)
-                        current_screen = stripped.replace(mv, "").strip()
-                        ticket_class=""  #reset ticket_class
-                        current_format= "2D" #reset current formal
-                        #skip=2 #skips the next 2 linese after the movei title
-                        #print("movie detected")
-
-                        #print(current_screen)
-                        continue
-
-                # Time detection HH:MM
-                #print("Hour detetciotn started")
-                if len(parts) >= 1 and re.match(r"\d{1,2}:\d{2}", parts[0]):
-                    #print("time")
-                    current_time = parts[0]
-
-
-
-                    # Check token after time for format
-                    #Format Detection
-
-                best_match = ""
-                for f in formats:
-                    if f in line and len(f) > len(best_match):
-                        best_match = f
-
-                if best_match:
-                    current_format = best_match
-                    current_format=build_max_label(current_screen,current_format)  # check if screen is MX and convert format to 2D ror 3D
-                    #override curre format if screen name matches one of the formats
-                    formats_set = {f.upper() for f in formats}
-                    if current_screen and current_screen.upper() in formats_set:
-                          current_format = current_screen
-
-                    
-
-
-
-
-                    # FIX: If time appears alone → add zero row
-                if len(parts) == 1 and re.match(r"\d{1,2}:\d{2}", parts[0]):
-                    page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    None,
-                    0,
-                    0,
-                    0,
-                    None,
-                    None,
-                    None
-                    ])
-                    continue
+            # Movie detection (line contains the movie name)
+            #print("Movie Deteciton Stareted")
+            mv = movie_matcher.longest(stripped)
+            if mv:
+                current_movie = mv
+                #print(current_movie)
+                current_screen = stripped.replace(mv, "").strip()
+                ticket_class=""  #reset ticket_class
+                current_format= "2D" #reset current formal
+                #skip=2 #skips the next 2 linese after the movei title
+                #print("movie detected")
 
+                #print(current_screen)
 
-                parts=remove_time_and_format(parts, current_time, current_format)
+            # Time detection HH:MM
+            #print("Hour detetciotn started")
+            if len(parts) >= 1 and HOUR_RE.match(parts[0]):
+                #print("time")
+                current_time = parts[0]
 
-                parts = parts[1:]  #remove the number before the ticket class
 
 
+                # Check token after time for format
+                #Format Detection
 
-                # Check if last 5 tokens are numeric fields
-                numeric_tail = parts[-5:]
+            best_match = format_matcher.longest(line)
 
-                # Must contain exactly 5 tokens
-                if len(numeric_tail) != 5:
-                    continue
-                #if all zeros skip
-                if all(t in ["0", "0.0", "0.00"] or t == 0 for t in numeric_tail):
-                    continue
+            if best_match:
+                current_format = best_match
+                current_format=build_max_label(current_screen,current_format)  # check if screen is MX and convert format to 2D ror 3D
+                #override curre format if screen name matches one of the formats
+                if current_screen and current_screen.upper() in formats_set:
+                      current_format = current_screen
+
+                
 
 
-                 #ticket class
-                ticket_class=parts[:-5]
-                ticket_class=" ".join(ticket_class).strip()
 
-                #update movei format in case SCREEN X is found intket class
-                if "SCREEN X" in ticket_class.upper():
-                  current_format = "SCREEN X"
+
+                # FIX: If time appears alone → add zero row
+            if len(parts) == 1 and HOUR_RE.match(parts[0]):
+                page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                None,
+                0,
+                0,
+                0,
+                None,
+                None,
+                None
+                ])
+                continue
 
 
+            parts=remove_time_and_format(parts, current_time, current_format)
 
-                # Validate each of the 5 numeric fields
-                is_numeric_tail = True
-                for x in numeric_tail:
-                    cleaned = x.replace(",", "")
-                    if cleaned.replace(".", "").isdigit():
-                        continue
-                    is_numeric_tail = False
-                    break
+            parts = parts[1:]  #remove the number before the ticket class
 
-                if not is_numeric_tail:
+
+
+            # Check if last 5 tokens are numeric fields
+            numeric_tail = parts[-5:]
+
+            # Must contain exactly 5 tokens
+            if len(numeric_tail) != 5:
+                continue
+            #if all zeros skip
+            if all(t in ["0", "0.0", "0.00"] or t == 0 for t in numeric_tail):
+                continue
+
+
+             #ticket class
+            ticket_class=parts[:-5]
+            ticket_class=" ".join(ticket_class).strip()
+
+            #update movei format in case SCREEN X is found intket class
+            if "SCREEN X" in ticket_class.upper():
+              current_format = "SCREEN X"
+
+
+
+            # Validate each of the 5 numeric fields
+            is_numeric_tail = True
+            for x in numeric_tail:
+                cleaned = x.replace(",", "")
+                if cleaned.replace(".", "").isdigit():
                     continue
+                is_numeric_tail = False
+                break
 
-                price, admits, gross, tax, net = numeric_tail
+            if not is_numeric_tail:
+                continue
 
+            price, admits, gross, tax, net = numeric_tail
 
 
-                admits = clean_num(admits)
-                gross  = clean_num(gross)
-                net    = clean_num(net)
-                price = clean_num(price)
 
-                # Append ticket row
-                page2_rows.append([
-                    current_movie,
-                    current_date,
-                    current_time,
-                    current_screen,
-                    current_format,
-                    ticket_class,
-                    0 if gross == 0 else admits,
-                    gross,
-                    net,
-                    admits if gross == 0 else 0,  #"in case price is 0 the put admists in comps and put admits=0
-                    None,
-                    None
+            admits = clean_num(admits)
+            gross  = clean_num(gross)
+            net    = clean_num(net)
+            price = clean_num(price)
 
+            # Append ticket row
+            page2_rows.append([
+                current_movie,
+                current_date,
+                current_time,
+                current_screen,
+                current_format,
+                ticket_class,
+                0 if gross == 0 else admits,
+                gross,
+                net,
+                admits if gross == 0 else 0,  #"in case price is 0 the put admists in comps and put admits=0
+                None,
+                None
 
-                ])
+
+            ])
 
     return page2_rows
 
@@ -478,11 +488,16 @@ def fetch_data(pdf_path,exhibitor):
     rows_page1 = []
     rows_page2 = []
 
-    f = os.path.basename(pdf_path)           # file name only
-    #week_type = get_week_type(f)
+    # pdf_path is a file path or the ParsedDocument the router already opened
+    with open_document(pdf_path) as doc:
+        f = os.path.basename(doc.path)           # file name only
+        #week_type = get_week_type(f)
 
-    # -------- PAGE 1 ----------
-    cinema_name, date_value, data_rows_page1, movie_list,week_type = extract_first_page(pdf_path)
+        # -------- PAGE 1 ----------
+        cinema_name, date_value, data_rows_page1, movie_list,week_type = extract_first_page(doc)
+
+        # -------- PAGE 2 ----------
+        page2_data = extract_page2_details(doc, movie_list)
 
 
 
@@ -498,9 +513,6 @@ def fetch_data(pdf_path,exhibitor):
       rows_page1.append(new_row)
 
 
-    # -------- PAGE 2 ----------
-    page2_data = extract_page2_details(pdf_path, movie_list)
-
     for idx, r in enumerate(page2_data, start=1):
       new_row = [
           f,                                      # File
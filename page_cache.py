@@ -0,0 +1,123 @@
+import os
+import time
+import zlib
+import sqlite3
+from collections import Counter
+from contextlib import closing
+
+from embedding_store import CACHE_DIR
+
+
+# Size bound of the cache file, least recently used reports are evicted first. 0 disables it.
+PAGE_CACHE_MB = int(os.environ.get("EMPIRE_BOR_PAGE_CACHE_MB", "256"))
+
+
+# --------------------------
+# PAGE TEXT CACHE
+# --------------------------
+class PageTextCache:
+    """
+    extract_text() of every page of a report, zlib-compressed in a local SQLite file and
+    keyed by ParsedDocument.content_key (file SHA-256 + pdfplumber version).
+    Consulted by ParsedDocument before the PDF is opened: a report seen before is routed
+    and parsed without any pdfplumber layout analysis.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or os.path.join(CACHE_DIR, "page_text.sqlite")
+        self.max_bytes = PAGE_CACHE_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.stats = Counter()      # "hits" / "misses", in pages
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    file_key   TEXT PRIMARY KEY,
+                    page_count INTEGER,
+                    bytes      INTEGER NOT NULL DEFAULT 0,
+                    last_used  REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    file_key TEXT NOT NULL,
+                    page     INTEGER NOT NULL,
+                    text     BLOB NOT NULL,
+                    PRIMARY KEY (file_key, page)
+                )
+                """
+            )
+
+    def _connect(self):
+        # a short-lived connection per call, like the alias store
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, key):
+        """
+        Returns (page count, {page index: text}) for a known file, else (None, {}).
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT page_count FROM files WHERE file_key = ?", (key,)).fetchone()
+            if row is None:
+                return None, {}
+
+            conn.execute("UPDATE files SET last_used = ? WHERE file_key = ?", (time.time(), key))
+            pages = conn.execute("SELECT page, text FROM pages WHERE file_key = ?", (key,)).fetchall()
+
+        return row[0], {page: zlib.decompress(blob).decode("utf-8") for page, blob in pages}
+
+    def store(self, key, page_count, pages):
+        """
+        pages: {page index: text} extracted since the last load, added to the file's entry.
+        """
+        if not pages:
+            return
+
+        blobs = [(key, page, zlib.compress(text.encode("utf-8"))) for page, text in pages.items()]
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO pages (file_key, page, text) VALUES (?, ?, ?)", blobs)
+            # summed from the pages table: a page stored again (two workers parsing duplicate
+            # uploads) replaces its row and must not be counted twice
+            size = conn.execute(
+                "SELECT COALESCE(SUM(length(text)), 0) FROM pages WHERE file_key = ?", (key,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO files (file_key, page_count, bytes, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(file_key) DO UPDATE SET "
+                "page_count = COALESCE(excluded.page_count, page_count), "
+                "bytes = excluded.bytes, last_used = excluded.last_used",
+                (key, page_count, size, time.time())
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in conn.execute("SELECT file_key, bytes FROM files ORDER BY last_used").fetchall():
+            conn.execute("DELETE FROM pages WHERE file_key = ?", (key,))
+            conn.execute("DELETE FROM files WHERE file_key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def report(self):
+        return f"{self.stats['hits']} pages from cache, {self.stats['misses']} extracted"
+
+
+_cache = None
+
+
+def get_page_cache():
+    global _cache
+    if _cache is None and PAGE_CACHE_MB > 0:
+        _cache = PageTextCache()
+    return _cache
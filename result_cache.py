@@ -0,0 +1,170 @@
+import os
+import glob
+import hashlib
+from collections import Counter
+
+import pandas as pd
+
+from embedding_store import CACHE_DIR
+
+
+# EMPIRE_BOR_RESULT_CACHE=0 always re-parses
+RESULT_CACHE_ENABLED = os.environ.get("EMPIRE_BOR_RESULT_CACHE", "1") != "0"
+# Size bound of the results directory, least recently used results are evicted first.
+# 0 disables the bound.
+RESULT_CACHE_MB = int(os.environ.get("EMPIRE_BOR_RESULT_CACHE_MB", "128"))
+
+_source_hashes = {}
+
+
+def source_hash(module):
+    """
+    Short hash of the source files of an exhibitor module (or of a spec: its specs file and
+    the engine), so an edit that forgot its PARSER_VERSION bump still misses. Empty where
+    the source is not on disk (the frozen EXE): there PARSER_VERSION alone decides.
+    """
+    name = module.__name__
+    if name not in _source_hashes:
+        digest = hashlib.sha256()
+        try:
+            for path in getattr(module, "source_files", None) or [module.__file__]:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            _source_hashes[name] = digest.hexdigest()[:12]
+        except (OSError, AttributeError, TypeError):
+            _source_hashes[name] = ""
+    return _source_hashes[name]
+
+
+# --------------------------
+# PARSED RESULT CACHE
+# --------------------------
+class ResultCache:
+    """
+    The DataFrame an exhibitor module's fetch_data returned, pickled per file:
+        <cache>/results/<module>/<content key>-<args>-<text backend>-v<PARSER_VERSION>-<source hash>.pkl
+
+    A re-run after editing the "Movies" or "Format" sheets goes straight to movie mapping,
+    date fixing and aggregation. Every exhibitor module has a PARSER_VERSION: bump it with
+    any change that alters the rows fetch_data returns, only that module's results miss.
+    The hash of the module's source is in the key as well, for the edits that do not.
+    Where the parser stopped at its end-of-data line is kept with the rows and replayed
+    into the document, so a cached file is still listed with its skipped pages.
+    Results not read for a while are evicted once the directory is over RESULT_CACHE_MB.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = os.path.join(directory or CACHE_DIR, "results")
+        self.max_bytes = RESULT_CACHE_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.stats = Counter()      # "hits" / "misses", in files
+        # bytes in the directory: scanned once, then kept up to date by store(). Other
+        # processes' results are only counted from the next scan, done on eviction
+        self._size = None
+
+    def _prefix(self, module, doc, args):
+        # exhibitor name, cinema map for KNCC, ...: everything else fetch_data is given,
+        # and the text backend it reads the pages with
+        args_hash = hashlib.sha256(repr(args).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(
+            self.directory, module.__name__.rsplit(".", 1)[-1],
+            f"{doc.content_key}-{args_hash}-{doc.text_backend_key}"
+        )
+
+    def _path(self, module, doc, args):
+        version = f"v{getattr(module, 'PARSER_VERSION', 0)}"
+        source = source_hash(module)
+        return f"{self._prefix(module, doc, args)}-{version}{'-' + source if source else ''}.pkl"
+
+    def load(self, module, doc, *args):
+        path = self._path(module, doc, args)
+        try:
+            source_path, df, stop = pd.read_pickle(path)
+        except Exception:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        # the modification time is the last use, for _evict
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if stop is not None:
+            # reported per file like a parse that ended at its end-of-data line
+            doc.replay_stop(*stop)
+        # modules write the (temp) file path or its name in the File column: point it at this upload
+        df[df.columns[0]] = df[df.columns[0]].replace({
+            source_path: doc.path,
+            os.path.basename(source_path): os.path.basename(doc.path),
+        })
+        return df
+
+    def store(self, module, doc, df, *args):
+        if df is None:
+            return
+
+        path = self._path(module, doc, args)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if self.max_bytes and self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+
+        # results of older parser versions for this file will not be read again
+        removed = 0
+        for old in glob.glob(glob.escape(self._prefix(module, doc, args)) + "-v*.pkl"):
+            try:
+                removed += os.path.getsize(old)
+                os.remove(old)
+            except OSError:
+                pass
+
+        tmp_path = path + ".tmp"
+        stop = (doc.pages_read, doc.pages_skipped) if doc.stopped else None
+        pd.to_pickle((doc.path, df, stop), tmp_path)
+        os.replace(tmp_path, path)
+
+        if self.max_bytes:
+            self._size += os.path.getsize(path) - removed
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        # (last use, size, path) of every cached result
+        entries = []
+        for path in glob.glob(os.path.join(glob.escape(self.directory), "*", "*.pkl")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            # down to 90%: a full cache is not scanned again on every store
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._size = total
+
+    def reset_stats(self):
+        self.stats.clear()
+
+    def report(self):
+        return f"{self.stats['hits']} files from cache, {self.stats['misses']} parsed"
+
+
+_cache = None
+
+
+def get_result_cache():
+    global _cache
+    if _cache is None and RESULT_CACHE_ENABLED:
+        _cache = ResultCache()
+    return _cache
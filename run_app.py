@@ -1,8 +1,15 @@
 import subprocess, sys, os
+import multiprocessing
 
-subprocess.call([
-    sys.executable,
-    "-m", "streamlit", "run",
-    os.path.join(os.path.dirname(__file__), "app.py"),
-    "--server.headless=true"
-])
+
+if __name__ == "__main__":
+    # the parse workers are spawned processes: in the frozen EXE they start this same
+    # executable, freeze_support() runs the worker there instead of another app
+    multiprocessing.freeze_support()
+
+    subprocess.call([
+        sys.executable,
+        "-m", "streamlit", "run",
+        os.path.join(os.path.dirname(__file__), "app.py"),
+        "--server.headless=true"
+    ])